@@ -1,3 +1,53 @@
+import re
+from time import perf_counter
+
+import instrumentation
+
+# Identifiers (P, x12, door_open), constants (0, 1), operators and parentheses
+_TOKEN_RE = re.compile(r'\s*(?:([A-Za-z_][A-Za-z0-9_]*)|([01])|([~&|>=()]))')
+_IDENTIFIER_RE = re.compile(r'[A-Za-z_][A-Za-z0-9_]*')
+OPERATORS = {'~', '&', '|', '>', '='}
+CONSTANTS = {'0': False, '1': True}
+
+
+def tokenize(infix):
+    """
+    Split an infix expression into tokens, skipping whitespace.
+    Variables are identifiers such as P, x12 or door_open, and 0/1 are the
+    constants False/True.
+    """
+    tokens = []
+    pos = 0
+    infix = infix.rstrip()
+    while pos < len(infix):
+        match = _TOKEN_RE.match(infix, pos)
+        if match is None:
+            raise ValueError(f"Unexpected character {infix[pos]!r} at position {pos} in {infix!r}")
+        tokens.append(match.group(match.lastindex))
+        pos = match.end()
+    return tokens
+
+
+def postfix_tokens(postfix):
+    """
+    Split a postfix string produced by Infix2Postfix back into tokens.
+    Single-character tokens are written back to back (e.g. 'PQ&'), longer ones
+    are separated by spaces (e.g. 'x1 door_open &').
+    """
+    if any(ch.isspace() for ch in postfix):
+        return postfix.split()
+    # A lone multi-character variable such as 'x1' is a single token
+    if _IDENTIFIER_RE.fullmatch(postfix):
+        return [postfix]
+    return list(postfix)
+
+
+def postfix_variables(postfix):
+    """Sorted list of the variables used in a postfix expression."""
+    return sorted({token for token in postfix_tokens(postfix)
+                   if token not in OPERATORS and token not in CONSTANTS})
+
+
 def Infix2Postfix(infix):
 
     # Define operator precedence (higher number = higher precedence)
@@ -7,21 +57,47 @@ def Infix2Postfix(infix):
     output = []        
     stack = []         
     
-    # Scan each character in the infix expression
-    for token in infix:
-        if token.isalpha():  
-            # Operand (A-Z) -> add directly to output
+    # Timing is only read when instrumentation is enabled
+    timing = instrumentation.ENABLED
+    if timing:
+        start = perf_counter()
+    tokens = tokenize(infix)
+    if timing:
+        parsed = perf_counter()
+        instrumentation.observe('task1_parse_seconds', parsed - start)
+
+    # True where an operand (variable, constant, '(' or '~') must come next,
+    # False where a binary operator or ')' must come next
+    expect_operand = True
+
+    # Scan each token in the infix expression
+    for token in tokens:
+        if token not in OPERATORS and token not in '()':
+            # Operand (variable or constant) -> add directly to output
+            if not expect_operand:
+                raise ValueError(f"Missing operator before {token!r} in {infix!r}")
             output.append(token)
+            expect_operand = False
         elif token == '(':
             # Left parenthesis -> push on stack
+            if not expect_operand:
+                raise ValueError(f"Missing operator before '(' in {infix!r}")
             stack.append(token)
         elif token == ')':
             # Right parenthesis -> pop until matching '('
+            if expect_operand:
+                raise ValueError(f"Missing operand before ')' in {infix!r}")
             while stack and stack[-1] != '(':
                 output.append(stack.pop())
+            if not stack:
+                raise ValueError(f"Unbalanced ')' in {infix!r}")
             stack.pop()  # Discard the '('
         else:
-            # Operator encountered
+            # Operator encountered: '~' is prefix, so it stands where an
+            # operand is expected, and a binary operator follows an operand
+            if expect_operand != (token == '~'):
+                raise ValueError(f"Misplaced operator {token!r} in {infix!r}")
+            expect_operand = True
             # Pop higher-precedence operators from stack to output
             # If equal precedence and token is left-associative, also pop
             while stack and stack[-1] != '(':
@@ -35,23 +111,137 @@ def Infix2Postfix(infix):
             # Push the current operator onto stack
             stack.append(token)
     
+    if expect_operand:
+        if not tokens:
+            raise ValueError("Empty expression")
+        raise ValueError(f"Missing operand at the end of {infix!r}")
+
     # Pop any remaining operators from stack to output
     while stack:
+        if stack[-1] == '(':
+            raise ValueError(f"Unbalanced '(' in {infix!r}")
         output.append(stack.pop())
+
+    if timing:
+        instrumentation.observe('task1_convert_seconds', perf_counter() - parsed)
     
-    # Return the joined postfix string
-    return ''.join(output)
+    # Return the joined postfix string, space separated if any token is longer
+    # than one character so that it can be split again
+    if all(len(token) == 1 for token in output):
+        return ''.join(output)
+    return ' '.join(output)
 
 import itertools
+import os
+import struct
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache, partial
+
+# Operators whose operands can be swapped without changing the result
+_COMMUTATIVE = {'&', '|', '='}
+
+
+@lru_cache(maxsize=4096)
+def build_dag(postfix):
+    """
+    Build a hash-consed expression DAG from a postfix expression.
+    Output: (variables, nodes, root). Each node is a tuple (op, left, right):
+    ('var', index, None), ('const', value, None), ('~', child, None) or
+    (operator, left, right), where children are indexes of earlier nodes.
+    Identical subformulas are stored once, so nodes in list order form a
+    topological order in which every subformula is evaluated exactly once.
+    """
+    variables = postfix_variables(postfix)
+    var_index = {var: i for i, var in enumerate(variables)}
+    nodes = []
+    table = {}  # node tuple -> index in nodes
+
+    def make(node):
+        # Return the shared node if this subformula was already seen
+        index = table.get(node)
+        if index is None:
+            index = table[node] = len(nodes)
+            nodes.append(node)
+        return index
+
+    stack = []
+    try:
+        for token in postfix_tokens(postfix):
+            if token in CONSTANTS:
+                stack.append(make(('const', CONSTANTS[token], None)))
+            elif token not in OPERATORS:
+                stack.append(make(('var', var_index[token], None)))
+            elif token == '~':
+                child = stack.pop()
+                # Double negation cancels out
+                if nodes[child][0] == '~':
+                    stack.append(nodes[child][1])
+                else:
+                    stack.append(make(('~', child, None)))
+            else:
+                right = stack.pop()
+                left = stack.pop()
+                # Order operands of commutative operators so Q&P shares P&Q
+                if token in _COMMUTATIVE and right < left:
+                    left, right = right, left
+                stack.append(make((token, left, right)))
+    except IndexError:
+        raise ValueError(f"Malformed postfix expression: {postfix!r}") from None
+    if len(stack) != 1:
+        raise ValueError(f"Malformed postfix expression: {postfix!r}")
+    return variables, nodes, stack[0]
+
+
+# Python source for each node of the DAG, filled with the operand names
+_OPERATOR_SOURCE = {
+    '~': 'not {0}',
+    '&': '{0} and {1}',
+    '|': '{0} or {1}',
+    '>': '(not {0}) or {1}',
+    '=': '{0} == {1}',
+}
+
+
+@lru_cache(maxsize=4096)
+def compile_postfix(postfix):
+    """
+    Compile a postfix logical expression into a Python function, once.
+    Input: postfix string as returned by Infix2Postfix.
+    Output: (variables, evaluate) where evaluate takes one boolean per variable,
+    in sorted variable order, and returns the value of the expression.
+    Every shared subformula of the DAG is computed once per call, and compiled
+    functions are kept in a bounded LRU cache keyed by the expression.
+    """
+    variables, nodes, root = build_dag(postfix)
+    names = []
+    lines = []
+    for index, (op, left, right) in enumerate(nodes):
+        if op == 'var':
+            names.append(f"v{left}")
+        elif op == 'const':
+            names.append(str(left))
+        else:
+            # One local per operator node, reused by every parent
+            names.append(f"t{index}")
+            operands = (names[left], names[right] if right is not None else None)
+            lines.append(f"    t{index} = {_OPERATOR_SOURCE[op].format(*operands)}")
+    params = ', '.join(f"v{i}" for i in range(len(variables)))
+    source = f"def evaluate({params}):\n" + ''.join(line + '\n' for line in lines)
+    source += f"    return {names[root]}\n"
+
+    namespace = {}
+    exec(compile(source, f"<postfix {postfix}>", 'exec'), {'__builtins__': {}}, namespace)
+    return variables, namespace['evaluate']
+
 
 def Postfix2Truthtable(postfix):
     """
     Given a postfix logical expression, print its truth table.
-    Input: postfix string with variables A-Z and operators ~(NOT), &(AND), |(OR), >(IMPLIES), =(IFF).
+    Input: postfix string with variables, constants 0/1 and operators ~(NOT), &(AND), |(OR), >(IMPLIES), =(IFF).
     Output: prints table of variable assignments and result.
     """
     # Extract unique variables and sort them for consistent ordering
-    variables = sorted({ch for ch in postfix if ch.isalpha()})
+    variables = postfix_variables(postfix)
     num_vars = len(variables)
     
     # Print header: variable names and the expression
@@ -59,54 +249,302 @@ def Postfix2Truthtable(postfix):
     print(' | '.join(header))
     print('-' * (4 * len(header) - 3))  # simple separator line
     
+    # Compile the expression once, each row is then a single function call
+    _, evaluate = compile_postfix(postfix)
+
     # Generate all combinations of truth values 
-    for values in itertools.product([True, False], repeat=num_vars):
-        # Map variable to its truth value in this combination
-        env = dict(zip(variables, values))
-        
-        # Evaluate the postfix expression using a stack
-        stack = []
-        for token in postfix:
-            if token.isalpha():
-                # Push the truth value of the variable
-                stack.append(env[token])
-            else:
-                if token == '~':
-                    # Unary NOT
-                    val = stack.pop()
-                    stack.append(not val)
-                else:
-                    # Binary operators: pop two values (right operand popped first)
-                    right = stack.pop()
-                    left = stack.pop()
-                    if token == '&':
-                        stack.append(left and right)
-                    elif token == '|':
-                        stack.append(left or right)
-                    elif token == '>':
-                        # Implication: True unless (left is True and right is False)
-                        stack.append((not left) or right)
-                    elif token == '=':
-                        # Biconditional (iff): True if both have same truth value
-                        stack.append(left == right)
-        
-        # The final stack value is the result
-        result = stack.pop()
-        
-        # Print the row: variable values and result (True/False)
-        row = [str(v) for v in values] + [str(result)]
-        print(' | '.join(row))
-
-testcases = [
-        "R|(P&Q)",
-        "~P|(Q&R)>R",
-        "P|(R&Q)",
-        "(P>Q)&(Q>R)",
-        "(P|~Q)>~P=(P|(~Q))>~P"
-    ]
-
-for expr in testcases:
-    print(f"\nInfix: {expr}")
-    postfix = Infix2Postfix(expr)
-    print(f"Postfix: {postfix}")
-    Postfix2Truthtable(postfix)
\ No newline at end of file
+    with instrumentation.timer('task1_truthtable_seconds', engine='rows'):
+        for values in itertools.product([True, False], repeat=num_vars):
+            result = evaluate(*values)
+
+            # Print the row: variable values and result (True/False)
+            row = [str(v) for v in values] + [str(result)]
+            print(' | '.join(row))
+    # Rows per second = rate of this counter / task1_truthtable_seconds
+    instrumentation.count('task1_truthtable_rows', 1 << num_vars, engine='rows')
+
+
+def _variable_column(index, num_vars):
+    """
+    Build the packed bit column of one variable over all 2^num_vars rows.
+    Bit r of the result is the value of the variable in row r, using the same
+    row order as itertools.product([True, False], repeat=num_vars).
+    """
+    # Variable `index` stays True for `block` rows, then False for `block` rows
+    block = 1 << (num_vars - 1 - index)
+    column = (1 << block) - 1
+    length = 2 * block
+    total = 1 << num_vars
+    # Double the pattern until it covers every row
+    while length < total:
+        column |= column << length
+        length *= 2
+    return column
+
+
+def _evaluate_bitcolumns(nodes, root, columns, mask):
+    """
+    Evaluate an expression DAG once over packed bit columns.
+    columns holds one bit column per variable, or is a function building the
+    column of a variable index when its node is reached; mask has one bit set
+    per row. Variable and intermediate columns are dropped after their last
+    use to bound memory.
+    """
+    last_use = {}
+    for index, (op, left, right) in enumerate(nodes):
+        if op not in ('var', 'const'):
+            last_use[left] = index
+            if right is not None:
+                last_use[right] = index
+
+    values = [None] * len(nodes)
+    for index, (op, left, right) in enumerate(nodes):
+        if op == 'var':
+            value = columns(left) if callable(columns) else columns[left]
+        elif op == 'const':
+            value = mask if left else 0
+        elif op == '~':
+            value = mask ^ values[left]
+        elif op == '&':
+            value = values[left] & values[right]
+        elif op == '|':
+            value = values[left] | values[right]
+        elif op == '>':
+            # Implication: (NOT left) OR right
+            value = (mask ^ values[left]) | values[right]
+        else:
+            # Biconditional: NOT (left XOR right)
+            value = mask ^ (values[left] ^ values[right])
+        values[index] = value
+        if op not in ('var', 'const'):
+            for child in (left, right):
+                if child is not None and last_use[child] == index and child != root:
+                    values[child] = None
+    return values[root]
+
+
+def _block_column(num_vars, block_bits, block, index):
+    """
+    Bit column of variable index for one block of 2^block_bits rows.
+    The last block_bits variables vary inside the block, the leading variables
+    are constant and taken from the bits of the block number.
+    """
+    num_fixed = num_vars - block_bits
+    if index >= num_fixed:
+        return _variable_column(index - num_fixed, block_bits)
+    # A 0 bit means True, matching itertools.product([True, False])
+    is_true = not (block >> (num_fixed - 1 - index)) & 1
+    return (1 << (1 << block_bits)) - 1 if is_true else 0
+
+
+def _block_columns(num_vars, block_bits, block):
+    """Bit columns of every variable for one block of 2^block_bits rows."""
+    return [_block_column(num_vars, block_bits, block, i) for i in range(num_vars)]
+
+
+def Postfix2Bitmask(postfix):
+    """
+    Evaluate a postfix logical expression over its whole truth table at once.
+    Input: postfix string as returned by Infix2Postfix.
+    Output: (variables, column) where bit r of the integer column is the result
+    of row r, in the same row order that Postfix2Truthtable prints.
+    """
+    variables, nodes, root = build_dag(postfix)
+    num_vars = len(variables)
+    mask = (1 << (1 << num_vars)) - 1
+
+    # One packed column per variable, each DAG node is then one bitwise op.
+    # Variable columns are built when first needed, not all up front.
+    with instrumentation.timer('task1_truthtable_seconds', engine='bitmask'):
+        columns = partial(_block_column, num_vars, num_vars, 0)
+        column = _evaluate_bitcolumns(nodes, root, columns, mask)
+    instrumentation.count('task1_truthtable_rows', 1 << num_vars, engine='bitmask')
+    return variables, column
+
+
+def _evaluate_slice(postfix, prefix_bits, return_column, prefix):
+    """
+    Worker for Postfix2BitmaskParallel: evaluate the rows whose first
+    prefix_bits variables are fixed by the bits of prefix.
+    Output: (true_rows, first_true_row, column) relative to the slice.
+    """
+    variables, nodes, root = build_dag(postfix)
+    slice_bits = len(variables) - prefix_bits
+    mask = (1 << (1 << slice_bits)) - 1
+    columns = partial(_block_column, len(variables), slice_bits, prefix)
+    result = _evaluate_bitcolumns(nodes, root, columns, mask)
+    # Lowest set bit is the first satisfying row of the slice
+    first = (result & -result).bit_length() - 1 if result else None
+    return result.bit_count(), first, result if return_column else None
+
+
+def Postfix2BitmaskParallel(postfix, workers=None, prefix_bits=None, return_column=True):
+    """
+    Evaluate a truth table on a process pool, split by the values of the first
+    prefix_bits variables so that each worker gets 2^(n - prefix_bits) rows.
+    Output: (variables, true_rows, first_true_row, column) where column is the
+    same packed result as Postfix2Bitmask (None if return_column is False) and
+    first_true_row is None when the expression is unsatisfiable.
+    """
+    variables = postfix_variables(postfix)
+    num_vars = len(variables)
+    workers = workers or os.cpu_count() or 1
+    if prefix_bits is None:
+        # A few slices per worker keeps the pool busy when slices differ in cost
+        prefix_bits = (4 * workers - 1).bit_length()
+    prefix_bits = min(prefix_bits, num_vars)
+    slice_rows = 1 << (num_vars - prefix_bits)
+
+    evaluate = partial(_evaluate_slice, postfix, prefix_bits, return_column)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        # map returns the slices in prefix order, which is also row order
+        parts = list(pool.map(evaluate, range(1 << prefix_bits)))
+
+    true_rows = sum(count for count, _, _ in parts)
+    first_true_row = None
+    for prefix, (_, first, _) in enumerate(parts):
+        if first is not None:
+            first_true_row = prefix * slice_rows + first
+            break
+
+    column = None
+    if return_column:
+        if slice_rows >= 8:
+            # Concatenate whole bytes instead of shifting ever larger integers
+            size = slice_rows // 8
+            column = int.from_bytes(b''.join(part.to_bytes(size, 'little') for _, _, part in parts), 'little')
+        else:
+            column = 0
+            for prefix, (_, _, part) in enumerate(parts):
+                column |= part << (prefix * slice_rows)
+    return variables, true_rows, first_true_row, column
+
+
+def iter_truthtable(postfix):
+    """
+    Lazily yield the rows of a truth table instead of printing them.
+    Output: (values, result) per row, in the order Postfix2Truthtable prints.
+    """
+    variables, evaluate = compile_postfix(postfix)
+    for values in itertools.product([True, False], repeat=len(variables)):
+        yield values, evaluate(*values)
+
+
+def iter_truthtable_blocks(postfix, block_bits=16):
+    """
+    Lazily yield a truth table as blocks of packed bit columns.
+    Output: (start, size, columns, result) per block, where start is the first
+    row of the block, columns holds one bit column per variable and bit r of
+    result is the value of row start + r. Memory stays bounded by the block size.
+    """
+    variables, nodes, root = build_dag(postfix)
+    num_vars = len(variables)
+    block_bits = min(block_bits, num_vars)
+    size = 1 << block_bits
+    mask = (1 << size) - 1
+
+    for block in range(1 << (num_vars - block_bits)):
+        columns = _block_columns(num_vars, block_bits, block)
+        result = _evaluate_bitcolumns(nodes, root, columns, mask)
+        yield block * size, size, columns, result
+
+
+def _bits_to_chars(column, size):
+    # Row r of the block becomes character r of the returned string
+    return format(column, f'0{size}b')[::-1]
+
+
+def write_truthtable_csv(postfix, file_path, block_bits=12):
+    """
+    Stream a truth table to a CSV file with 1/0 cells, in constant memory.
+    file_path may also be an open text file, such as sys.stdout.
+    """
+    variables = postfix_variables(postfix)
+    num_vars = len(variables)
+    block_bits = min(block_bits, num_vars)
+    num_fixed = num_vars - block_bits
+
+    file = open(file_path, 'w', newline='', encoding='utf-8') if isinstance(file_path, str) else file_path
+    try:
+        file.write(','.join(variables + [postfix]) + '\n')
+        low_parts = None
+        for _, size, columns, result in iter_truthtable_blocks(postfix, block_bits):
+            # The varying part of each line is identical in every block
+            if low_parts is None:
+                low_cells = [_bits_to_chars(c, size) for c in columns[num_fixed:]]
+                low_parts = [''.join(cells[r] + ',' for cells in low_cells) for r in range(size)]
+            high_part = ''.join('1,' if c else '0,' for c in columns[:num_fixed])
+            result_cells = _bits_to_chars(result, size)
+            file.writelines(f"{high_part}{low}{res}\n" for low, res in zip(low_parts, result_cells))
+    finally:
+        if file is not file_path:
+            file.close()
+
+
+# Header of the bit-packed truth-table format
+_BITS_MAGIC = b'TTBL'
+_BITS_HEADER = struct.Struct('<4sBHB')
+
+
+def write_truthtable_bits(postfix, file_path, block_bits=16):
+    """
+    Stream a truth table to a bit-packed binary file, one bit per row per column.
+    Layout: header (magic, version, number of variables, block bits), the postfix
+    and variable names as length-prefixed UTF-8, then every block in row order
+    as one little-endian packed column per variable followed by the result column.
+    """
+    variables = postfix_variables(postfix)
+    block_bits = min(block_bits, len(variables))
+    num_bytes = max(1, (1 << block_bits) // 8)
+
+    with open(file_path, 'wb') as file:
+        file.write(_BITS_HEADER.pack(_BITS_MAGIC, 1, len(variables), block_bits))
+        for name in [postfix] + variables:
+            encoded = name.encode('utf-8')
+            file.write(struct.pack('<I', len(encoded)) + encoded)
+        for _, _, columns, result in iter_truthtable_blocks(postfix, block_bits):
+            for column in columns + [result]:
+                file.write(column.to_bytes(num_bytes, 'little'))
+
+
+def read_truthtable_bits(file_path):
+    """
+    Read a file written by write_truthtable_bits block by block.
+    Output: (postfix, variables, blocks) where blocks lazily yields
+    (start, size, columns, result) exactly like iter_truthtable_blocks.
+    """
+    file = open(file_path, 'rb')
+    magic, version, num_vars, block_bits = _BITS_HEADER.unpack(file.read(_BITS_HEADER.size))
+    if magic != _BITS_MAGIC or version != 1:
+        file.close()
+        raise ValueError(f"Not a bit-packed truth table file: {file_path}")
+    names = []
+    for _ in range(num_vars + 1):
+        (length,) = struct.unpack('<I', file.read(4))
+        names.append(file.read(length).decode('utf-8'))
+    size = 1 << block_bits
+    num_bytes = max(1, size // 8)
+
+    def blocks():
+        with file:
+            for block in range(1 << (num_vars - block_bits)):
+                columns = [int.from_bytes(file.read(num_bytes), 'little') for _ in range(num_vars + 1)]
+                yield block * size, size, columns[:-1], columns[-1]
+
+    return names[0], names[1:], blocks()
+
+
+if __name__ == "__main__":
+    testcases = [
+            "R|(P&Q)",
+            "~P|(Q&R)>R",
+            "P|(R&Q)",
+            "(P>Q)&(Q>R)",
+            "(P|~Q)>~P=(P|(~Q))>~P"
+        ]
+
+    for expr in testcases:
+        print(f"\nInfix: {expr}")
+        postfix = Infix2Postfix(expr)
+        print(f"Postfix: {postfix}")
+        Postfix2Truthtable(postfix)
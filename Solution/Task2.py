@@ -1,59 +1,501 @@
+import hashlib
+import json
+import os
+
+import numpy as np
 import pandas as pd
 from datetime import datetime, timedelta
 
-# load data from CSV file
-def load_data(file_path='students.csv'):
+import instrumentation
+
+# Column types of students.csv: float32 scores, categorical names and the raw
+# DayOfBirth strings (also categorical), only parsed on demand by birth_dates
+STUDENT_DTYPES = {
+    'StudentID': 'str',
+    'StudentName': 'category',
+    'DayOfBirth': 'category',
+    'Math': 'float32',
+    'CS': 'float32',
+    'Eng': 'float32',
+}
+CACHE_VERSION = 2
+
+
+def _file_sha256(file_path):
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as file:
+        for block in iter(lambda: file.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _source_signature(file_path, validate):
+    # What the cache must match to be reused: mtime and size, or the content hash
+    stat = os.stat(file_path)
+    signature = {'mtime_ns': stat.st_mtime_ns, 'size': stat.st_size}
+    if validate == 'hash':
+        signature = {'sha256': _file_sha256(file_path)}
+    return signature
+
+
+def _save_array(path, array):
+    # Write to a new file and rename it, so existing memory maps stay valid
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'wb') as file:
+        np.save(file, array)
+    os.replace(tmp_path, path)
+
+
+def _write_cache(data, cache_dir, signature):
+    os.makedirs(cache_dir, exist_ok=True)
+    meta_path = os.path.join(cache_dir, 'meta.json')
+    # meta.json is written last and marks the cache as complete
+    if os.path.exists(meta_path):
+        os.remove(meta_path)
+    columns = []
+    for name in data.columns:
+        column = data[name]
+        path = os.path.join(cache_dir, name)
+        if isinstance(column.dtype, pd.CategoricalDtype):
+            _save_array(path + '.codes.npy', column.cat.codes.to_numpy())
+            _save_array(path + '.categories.npy', column.cat.categories.to_numpy(dtype=str))
+            columns.append([name, 'category'])
+        elif pd.api.types.is_numeric_dtype(column.dtype):
+            _save_array(path + '.npy', column.to_numpy())
+            columns.append([name, str(column.dtype)])
+        else:
+            # Missing strings are kept in a mask, not as the text 'nan'
+            _save_array(path + '.npy', column.to_numpy(dtype=str, na_value=''))
+            _save_array(path + '.isna.npy', column.isna().to_numpy())
+            columns.append([name, 'str'])
+    meta = {'version': CACHE_VERSION, 'source': signature, 'rows': len(data), 'columns': columns}
+    with open(meta_path + '.tmp', 'w', encoding='utf-8') as file:
+        json.dump(meta, file)
+    os.replace(meta_path + '.tmp', meta_path)
+
+
+def _open_cache(cache_dir, signature, mmap_mode='r'):
+    """
+    Memory-map the columns of a valid cache without reading them. The maps
+    are read-only by default; mmap_mode='c' gives private copy-on-write maps
+    that can be modified without touching the cache files.
+    Output: (rows, [(name, kind, arrays)]), or None if the cache is missing
+    or stale.
+    """
     try:
-        data = pd.read_csv(file_path)
+        with open(os.path.join(cache_dir, 'meta.json'), encoding='utf-8') as file:
+            meta = json.load(file)
+    except (OSError, ValueError):
+        return None
+    if meta.get('version') != CACHE_VERSION or meta.get('source') != signature:
+        return None
 
-        data['Math'] = pd.to_numeric(data['Math'])
-        data['CS'] = pd.to_numeric(data['CS'])
-        data['Eng'] = pd.to_numeric(data['Eng'])
+    columns = []
+    for name, kind in meta['columns']:
+        path = os.path.join(cache_dir, name)
+        if kind == 'category':
+            arrays = (np.load(path + '.codes.npy', mmap_mode=mmap_mode), np.load(path + '.categories.npy'))
+        elif kind == 'str':
+            arrays = (np.load(path + '.npy', mmap_mode=mmap_mode), np.load(path + '.isna.npy', mmap_mode=mmap_mode))
+        else:
+            arrays = (np.load(path + '.npy', mmap_mode=mmap_mode),)
+        columns.append((name, kind, arrays))
+    return meta['rows'], columns
+
+
+def _cache_frame(columns, start, stop):
+    # DataFrame of rows [start, stop) of an opened cache
+    frame = {}
+    for name, kind, arrays in columns:
+        if kind == 'category':
+            frame[name] = pd.Categorical.from_codes(arrays[0][start:stop], arrays[1])
+        elif kind == 'str':
+            values = pd.array(arrays[0][start:stop], dtype='str')
+            missing = np.asarray(arrays[1][start:stop])
+            if missing.any():
+                values[missing] = None
+            frame[name] = values
+        else:
+            # Numeric columns stay memory maps of the cache files
+            frame[name] = arrays[0][start:stop]
+    return pd.DataFrame(frame, index=pd.RangeIndex(start, stop), copy=False)
+
+
+def _read_cache(cache_dir, signature):
+    # The cached DataFrame, or None if the cache is missing or stale. The maps
+    # are copy-on-write so that the frame is writable, like a freshly parsed one
+    cache = _open_cache(cache_dir, signature, mmap_mode='c')
+    if cache is None:
+        return None
+    rows, columns = cache
+    return _cache_frame(columns, 0, rows)
+
+
+def load_students(file_path='students.csv', use_cache=True, validate='mtime'):
+    """
+    Load students.csv with an explicit schema (STUDENT_DTYPES).
+    The parsed columns are kept as .npy files in a '<file>.cache' directory
+    next to the CSV and memory-mapped on the next load. The cache is reused
+    while the CSV keeps its mtime and size (validate='mtime') or its SHA-256
+    (validate='hash'), and rebuilt otherwise.
+    Raises OSError if the file cannot be read and ValueError if it does not
+    match the schema.
+    """
+    signature = _source_signature(file_path, validate)
+    cache_dir = file_path + '.cache'
+    if use_cache:
+        data = _read_cache(cache_dir, signature)
+        if data is not None:
+            return data
+
+    data = pd.read_csv(file_path, dtype=STUDENT_DTYPES)
+    missing = set(STUDENT_DTYPES) - set(data.columns)
+    if missing:
+        raise ValueError(f"{file_path} is missing columns: {', '.join(sorted(missing))}")
+    if use_cache:
+        try:
+            _write_cache(data, cache_dir, signature)
+        except OSError:
+            # A read-only directory only costs the speed-up, not the data
+            pass
+    return data
+
+
+class _ByteRange:
+    # File object reading at most limit bytes from the current position, so
+    # that rows appended while the CSV is parsed are left for the next read
+    def __init__(self, file, limit):
+        self.file = file
+        self.limit = limit
+
+    def read(self, size=-1):
+        if size is None or size < 0 or size > self.limit:
+            size = self.limit
+        data = self.file.read(size)
+        self.limit -= len(data)
         return data
+
+
+def complete_lines_end(file_path, block_size=1 << 16):
+    """
+    Byte offset just past the last newline of a file, so that a line still
+    being written by an appending process is left out.
+    Output: offset (0 if the file holds no complete line).
+    """
+    with open(file_path, 'rb') as file:
+        position = os.fstat(file.fileno()).st_size
+        while position > 0:
+            begin = max(position - block_size, 0)
+            file.seek(begin)
+            newline = file.read(position - begin).rfind(b'\n')
+            if newline >= 0:
+                return begin + newline + 1
+            position = begin
+    return 0
+
+
+def iter_student_chunks(file_path='students.csv', chunk_size=1 << 20, use_cache=True, validate='mtime', start=0,
+                        offset=None, end=None):
+    """
+    Yield the students table in chunks of at most chunk_size rows, so that
+    memory stays bounded whatever the size of the file. Slices of the columnar
+    cache are used when it is valid, otherwise the CSV is parsed chunk by chunk.
+    Rows before start are skipped, and rows keep their position in the file
+    as index, across chunks.
+    offset is the byte offset of row start in the CSV, when known: parsing then
+    seeks straight to it instead of reading past the earlier rows. The CSV is
+    read up to byte end (default: the end of the file).
+    """
+    cache = _open_cache(file_path + '.cache', _source_signature(file_path, validate)) if use_cache else None
+    if cache is not None:
+        rows, columns = cache
+        for begin in range(start, rows, chunk_size):
+            yield _cache_frame(columns, begin, min(begin + chunk_size, rows))
+        return
+    with open(file_path, 'rb') as file:
+        if end is None:
+            end = os.fstat(file.fileno()).st_size
+        options = {'dtype': STUDENT_DTYPES, 'chunksize': chunk_size}
+        if offset is not None:
+            # Only the header is parsed for the column names, then the rows from offset
+            options.update(header=None, names=list(pd.read_csv(file_path, nrows=0).columns))
+            file.seek(offset)
+        elif start:
+            options['skiprows'] = lambda line: 0 < line <= start
+        if file.tell() >= end:
+            return
+        with pd.read_csv(_ByteRange(file, end - file.tell()), **options) as reader:
+            for chunk in reader:
+                if start:
+                    chunk.index += start
+                yield chunk
+
+
+def birth_dates(data):
+    # DayOfBirth parsed to datetimes when a caller needs it; each distinct
+    # date string is parsed once
+    day_of_birth = data['DayOfBirth']
+    if isinstance(day_of_birth.dtype, pd.CategoricalDtype):
+        dates = pd.to_datetime(day_of_birth.cat.categories, format='%d/%m/%Y')
+        # Missing dates have code -1, which becomes NaT rather than the last date
+        dates = dates.take(day_of_birth.cat.codes.to_numpy(), allow_fill=True, fill_value=pd.NaT)
+        return pd.Series(dates, index=data.index, name='DayOfBirth')
+    return pd.to_datetime(day_of_birth, format='%d/%m/%Y')
+
+
+# load data from CSV file
+def load_data(file_path='students.csv'):
+    try:
+        return load_students(file_path)
     except Exception as e:
         print(f"Lỗi khi đọc file: {e}")
         return None
 
+class Predicate:
+    """
+    A predicate over students. Called on a DataFrame it returns a boolean
+    column mask for every student at once, called on a single row it returns
+    one boolean. Predicates compose with & (and), | (or) and ~ (not).
+    """
+
+    def __init__(self, func=None, name=None, op=None, operands=()):
+        self.func = func
+        self.op = op
+        self.operands = operands
+        self.name = name or func.__name__
+        # Structural key: predicates with the same key always agree. Leaves are
+        # keyed by their function object, not by name, since distinct
+        # functions (two lambdas, say) may share a name
+        self.key = (op,) + tuple(operand.key for operand in operands) if op else ('pred', self.name, func)
+
+    def __call__(self, data):
+        return self.mask(data)
+
+    def mask(self, data, cache=None):
+        """
+        Evaluate the predicate on data. cache, if given, is a dict shared by
+        several predicates so that common sub-predicates are computed once.
+        """
+        if cache is not None and self.key in cache:
+            return cache[self.key]
+        if self.op is None:
+            result = self.func(data)
+        elif self.op == '~':
+            result = np.logical_not(self.operands[0].mask(data, cache))
+        elif self.op == '&':
+            result = np.logical_and(self.operands[0].mask(data, cache), self.operands[1].mask(data, cache))
+        else:
+            result = np.logical_or(self.operands[0].mask(data, cache), self.operands[1].mask(data, cache))
+        if cache is not None:
+            cache[self.key] = result
+        return result
+
+    def __and__(self, other):
+        return Predicate(name=f"({self.name} & {other.name})", op='&', operands=(self, other))
+
+    def __or__(self, other):
+        return Predicate(name=f"({self.name} | {other.name})", op='|', operands=(self, other))
+
+    def __invert__(self):
+        # Push the negation down (De Morgan) so equivalent negations share a key
+        if self.op == '~':
+            return self.operands[0]
+        if self.op == '&':
+            return ~self.operands[0] | ~self.operands[1]
+        if self.op == '|':
+            return ~self.operands[0] & ~self.operands[1]
+        return Predicate(name=f"~{self.name}", op='~', operands=(self,))
+
+    def __repr__(self):
+        return f"Predicate({self.name})"
+
+
+def predicate(func):
+    # Decorator turning a column expression into a Predicate
+    return Predicate(func)
+
+
+# ∀x P(x): the mask is True for every student
+def forall(pred, data):
+    return bool(pred.mask(data).all())
+
+
+# ∃x P(x): the mask is True for at least one student
+def exists(pred, data):
+    return bool(pred.mask(data).any())
+
+
+def exists_chunks(pred, chunks):
+    """
+    ∃x P(x) over a stream of chunks, e.g. iter_student_chunks(...).
+    Reading stops at the first chunk with a witness.
+    Output: (True, witness row) or (False, None).
+    """
+    for chunk in chunks:
+        mask = np.asarray(pred.mask(chunk), dtype=bool)
+        if mask.any():
+            return True, chunk.iloc[int(mask.argmax())]
+    return False, None
+
+
+def forall_chunks(pred, chunks):
+    """
+    ∀x P(x) over a stream of chunks, stopping at the first counterexample.
+    Output: (False, counterexample row) or (True, None).
+    """
+    found, counterexample = exists_chunks(~pred, chunks)
+    return not found, counterexample
+
+
+def plan_statements(statements):
+    """
+    Plan a batch of quantified statements {name: (quantifier, predicate)},
+    where quantifier is 'forall' or 'exists'.
+    A statement and its negation need the same scan: ∃x ~P(x) is the
+    complement of ∀x P(x). Each statement is therefore rewritten to a
+    canonical check and the planner only keeps the distinct checks.
+    Output: (checks, targets) where checks is a list of (quantifier, predicate)
+    and targets maps each name to (check index, negated).
+    """
+    checks = []
+    index = {}
+    targets = {}
+    for name, (quantifier, pred) in statements.items():
+        negated = False
+        dual = ~pred
+        # Pick one of the two equivalent forms, deterministically
+        if repr(dual.key) < repr(pred.key):
+            quantifier = 'exists' if quantifier == 'forall' else 'forall'
+            pred = dual
+            negated = True
+        key = (quantifier, pred.key)
+        if key not in index:
+            index[key] = len(checks)
+            checks.append((quantifier, pred))
+        targets[name] = (index[key], negated)
+    return checks, targets
+
+
+def iter_row_chunks(data, chunk_size=1 << 20):
+    # Slices of a DataFrame, the unit of work of run_plan
+    for start in range(0, len(data), chunk_size):
+        yield data.iloc[start:start + chunk_size]
+
+
+def run_plan(plan, chunks, witnesses=None):
+    """
+    Evaluate every check of a plan in one fused pass over the row chunks.
+    Shared sub-predicates are computed once per chunk, a check stops as soon
+    as its result is known (∃ finds a witness, ∀ finds a counterexample) and
+    the scan stops once every check is decided, without reading further chunks.
+    If a dict is given as witnesses, the row that decided each such statement
+    is stored in it under the statement name.
+    Output: dict from statement name to its truth value.
+    """
+    checks, targets = plan
+    # ∀ is True and ∃ is False until a chunk proves otherwise
+    results = [quantifier == 'forall' for quantifier, _ in checks]
+    found = {}
+    pending = set(range(len(checks)))
+    scanned = [0] * len(checks)
+    for chunk in chunks:
+        cache = {}
+        for i in list(pending):
+            quantifier, pred = checks[i]
+            scanned[i] += len(chunk)
+            mask = np.asarray(pred.mask(chunk, cache), dtype=bool)
+            if quantifier == 'forall':
+                mask = ~mask
+            if mask.any():
+                results[i] = quantifier == 'exists'
+                found[i] = chunk.iloc[int(mask.argmax())]
+                pending.discard(i)
+        if not pending:
+            break
+    for name, (i, _) in targets.items():
+        instrumentation.count('task2_rows_scanned', scanned[i], statement=name)
+    if witnesses is not None:
+        for name, (i, _) in targets.items():
+            if i in found:
+                witnesses[name] = found[i]
+    return {name: results[i] != negated for name, (i, negated) in targets.items()}
+
+
+def evaluate_statements(data, names=None, chunk_size=1 << 20, witnesses=None):
+    """
+    Evaluate the statements of STATEMENTS (all of them, or the given names)
+    with a single fused scan of data.
+    """
+    names = STATEMENTS if names is None else names
+    plan = plan_statements({name: STATEMENTS[name] for name in names})
+    return run_plan(plan, iter_row_chunks(data, chunk_size), witnesses)
+
+
+def evaluate_statements_from_file(file_path='students.csv', names=None, chunk_size=1 << 20, witnesses=None):
+    """
+    Same as evaluate_statements, but streams the file with iter_student_chunks
+    instead of loading it, and stops reading once every statement is decided.
+    """
+    names = STATEMENTS if names is None else names
+    plan = plan_statements({name: STATEMENTS[name] for name in names})
+    return run_plan(plan, iter_student_chunks(file_path, chunk_size), witnesses)
+
+
 """
 Define these predicates based on your dataset, each predicate should return a 
 boolean value for a given input.
 """
 #  all scores are greater than or equal to 5
+@predicate
 def is_passing(student):
-    return student['Math'] >= 5 and student['CS'] >= 5 and student['Eng'] >= 5
+    return (student['Math'] >= 5) & (student['CS'] >= 5) & (student['Eng'] >= 5)
 
 # math score is greater than or equal to 9
+@predicate
 def is_high_math(student):
     return student['Math'] >= 9
 
 # math and cs score is less than 6
+@predicate
 def is_struggling(student):
-    return student['Math'] < 6 and student['CS'] < 6
+    return (student['Math'] < 6) & (student['CS'] < 6)
 
 # cs score is greater than math score
+@predicate
 def improved_in_cs(student):
     return student['CS'] > student['Math']
 
+# math score is greater than 3
+@predicate
+def has_math_above_3(student):
+    return student['Math'] > 3
+
+# math score is less than 6
+@predicate
+def has_low_math(student):
+    return student['Math'] < 6
+
+# at least one subject score is greater than 6
+@predicate
+def has_subject_above_6(student):
+    return (student['Math'] > 6) | (student['CS'] > 6) | (student['Eng'] > 6)
+
 def display_predicates_results(data):
-    results = []
-    for _, student in data.iterrows():
-        result = {
-            'StudentID': student['StudentID'],
-            'StudentName': student['StudentName'],
-            'is_passing': is_passing(student),
-            'is_high_math': is_high_math(student),
-            'is_struggling': is_struggling(student),
-            'improved_in_cs': improved_in_cs(student)
-        }
-        results.append(result)
+    # Evaluate each predicate once over the whole table
+    results = data[['StudentID', 'StudentName']].assign(
+        is_passing=is_passing.mask(data),
+        is_high_math=is_high_math.mask(data),
+        is_struggling=is_struggling.mask(data),
+        improved_in_cs=improved_in_cs.mask(data),
+    )
     
     print("\nResults of predicates on each student:")
-    for result in results:
-        print(f"Student {result['StudentID']} - {result['StudentName']}:")
-        print(f"  - Passed all subjects: {result['is_passing']}")
-        print(f"  - High math scores: {result['is_high_math']}")
-        print(f"  - Is struggling: {result['is_struggling']}")
-        print(f"  - Improved in cs : {result['improved_in_cs']}")
+    for result in results.itertuples(index=False):
+        print(f"Student {result.StudentID} - {result.StudentName}:")
+        print(f"  - Passed all subjects: {result.is_passing}")
+        print(f"  - High math scores: {result.is_high_math}")
+        print(f"  - Is struggling: {result.is_struggling}")
+        print(f"  - Improved in cs : {result.improved_in_cs}")
         print()
 
 """
@@ -64,66 +506,50 @@ over your dataset.
 
 # All students passed all subjects
 def all_students_passed(data):
-    for _, student in data.iterrows():
-        if not is_passing(student):
-            return False
-    return True
+    return forall(is_passing, data)
 
 # All students have a math score higher than 3
 def all_students_math_above_3(data):
-    for _, student in data.iterrows():
-        if not (student['Math'] > 3):
-            return False
-    return True
+    return forall(has_math_above_3, data)
 
 # 2 Existential quantifications (e.g., ∃x P(x))
 
 # There exists a student who scored above 9 in math
 def exists_student_high_math(data):
-    for _, student in data.iterrows():
-        if is_high_math(student):
-            return True
-    return False
+    return exists(is_high_math, data)
 
 # There exists a student who improved in CS over Math
 def exists_student_improved_in_cs(data):
-    for _, student in data.iterrows():
-        if improved_in_cs(student):
-            return True
-    return False
+    return exists(improved_in_cs, data)
 
 # 2 Combined/nested statements (e.g., ∀x ∃y Q(x, y))
 
 def for_every_student_exists_subject_above_6(data):
-    for _, student in data.iterrows():
-        if student['Math'] <= 6 and student['CS'] <= 6 and student['Eng'] <= 6:
-            return False
-    return True
+    return forall(has_subject_above_6, data)
 
 # For every student scoring below 6 in Math, there exists a subject where they scored above 6
 def for_every_student_with_low_math_exists_subject_above_6(data):
-    for _, student in data.iterrows():
-        if student['Math'] < 6:
-            if student['CS'] <= 6 and student['Eng'] <= 6:
-                return False
-    return True
+    return forall(~has_low_math | has_subject_above_6, data)
 
 # Function evaluate quantified statements
-def evaluate_quantified_statements(data):
+def evaluate_quantified_statements(data, results=None):
+    # One fused scan for every statement, unless results are already known
+    if results is None:
+        results = evaluate_statements(data)
     
     print("\nEvaluate quantified statements:")
     
     print("\n1. Universal quantifications (e.g., ∀x P(x)):")
-    print(f"- All students passed: {all_students_passed(data)}")
-    print(f"- All students have math scores higher than 3: {all_students_math_above_3(data)}")
+    print(f"- All students passed: {results['all_students_passed']}")
+    print(f"- All students have math scores higher than 3: {results['all_students_math_above_3']}")
     
     print("\n2. Existential quantifications (e.g., ∃x P(x)):")
-    print(f"- There exists a student whose math score is above 9: {exists_student_high_math(data)}")
-    print(f"- There is a student whose cs score is higher than his math score.: {exists_student_improved_in_cs(data)}")
+    print(f"- There exists a student whose math score is above 9: {results['exists_student_high_math']}")
+    print(f"- There is a student whose cs score is higher than his math score.: {results['exists_student_improved_in_cs']}")
     
     print("\n3. 2 Combined/nested statements (e.g., ∀x ∃y Q(x, y)):")
-    print(f"- For every student, there exists a subject in which they score above 6: {for_every_student_exists_subject_above_6(data)}")
-    print(f"- For every student who scores below 6 in math, there exists one subject in which they score above 6: {for_every_student_with_low_math_exists_subject_above_6(data)}")
+    print(f"- For every student, there exists a subject in which they score above 6: {results['for_every_student_exists_subject_above_6']}")
+    print(f"- For every student who scores below 6 in math, there exists one subject in which they score above 6: {results['for_every_student_with_low_math_exists_subject_above_6']}")
 
 
 """
@@ -135,85 +561,85 @@ above and explain their meaning in plain English.
 # Negation of 'All students passed all subjects'
 # There exists at least one student who did not pass all subjects
 def not_all_students_passed(data):
-    for _, student in data.iterrows():
-        if not is_passing(student):
-            return True
-    return False
+    return exists(~is_passing, data)
 
 # Negation of 'All students have math scores higher than 3'
 # There exists at least one student whose math score is less than or equal to 3
 def not_all_students_math_above_3(data):
-    for _, student in data.iterrows():
-        if student['Math'] <= 3:
-            return True
-    return False
+    return exists(~has_math_above_3, data)
 
 # Negation of Existential Quantifications
 
 # Negation of 'There exists a student who scored above 9 in math"
 # All students have math scores less than 9.
 def not_exists_student_high_math(data):
-    for _, student in data.iterrows():
-        if is_high_math(student):
-            return False
-    return True
+    return forall(~is_high_math, data)
 
 # Negation of 'There exists a student who improved in CS over Math'
 # All students have CS scores less than or equal to their Math scores.
 def not_exists_student_improved_in_cs(data):
-    for _, student in data.iterrows():
-        if improved_in_cs(student):
-            return False
-    return True
+    return forall(~improved_in_cs, data)
 
 # Negation of Combined/Nested Quantifications
 
 # Negation of 'For every student, there exists a subject in which they scored above 6
 # There exists at least one student who scored 6 or lower in all subjects.
 def not_for_every_student_exists_subject_above_6(data):
-    for _, student in data.iterrows():
-        if student['Math'] <= 6 and student['CS'] <= 6 and student['Eng'] <= 6:
-            return True
-    return False
+    return exists(~has_subject_above_6, data)
 
 # Negation of 'For every student scoring below 6 in Math, there exists a subject where they scored above 6
 # There exists at least one student who has a Math score below 6 and also scored 6 or lower in all other subjects.
 def not_for_every_student_with_low_math_exists_subject_above_6(data):
-    for _, student in data.iterrows():
-        if student['Math'] < 6:
-            if student['CS'] <= 6 and student['Eng'] <= 6:
-                return True
-    return False
+    return exists(has_low_math & ~has_subject_above_6, data)
+
+# Every statement above as (quantifier, predicate), for the fused planner
+STATEMENTS = {
+    'all_students_passed': ('forall', is_passing),
+    'all_students_math_above_3': ('forall', has_math_above_3),
+    'exists_student_high_math': ('exists', is_high_math),
+    'exists_student_improved_in_cs': ('exists', improved_in_cs),
+    'for_every_student_exists_subject_above_6': ('forall', has_subject_above_6),
+    'for_every_student_with_low_math_exists_subject_above_6': ('forall', ~has_low_math | has_subject_above_6),
+    'not_all_students_passed': ('exists', ~is_passing),
+    'not_all_students_math_above_3': ('exists', ~has_math_above_3),
+    'not_exists_student_high_math': ('forall', ~is_high_math),
+    'not_exists_student_improved_in_cs': ('forall', ~improved_in_cs),
+    'not_for_every_student_exists_subject_above_6': ('exists', ~has_subject_above_6),
+    'not_for_every_student_with_low_math_exists_subject_above_6': ('exists', has_low_math & ~has_subject_above_6),
+}
 
 # Function evaluate the negation of the quantified statements
-def evaluate_negated_statements(data):
+def evaluate_negated_statements(data, results=None):
+    # One fused scan for every statement, unless results are already known
+    if results is None:
+        results = evaluate_statements(data)
     print("\nEvaluate the negation of the quantified statements :")
     
     # 1. Negation of Universal Quantifications
     print("\n1. Negation of Universal Quantifications:")
 
-    print(f"- Negation of 'All students passed all subjects': {not_all_students_passed(data)}")
+    print(f"- Negation of 'All students passed all subjects': {results['not_all_students_passed']}")
     print("  Meaning: There exists at least one student who did not pass all subjects.")
 
-    print(f"- Negation of 'All students have math scores higher than 3': {not_all_students_math_above_3(data)}")
+    print(f"- Negation of 'All students have math scores higher than 3': {results['not_all_students_math_above_3']}")
     print("  Meaning: There exists at least one student whose math score is less than or equal to 3.")
 
     # 2. Negation of Existential Quantifications
     print("\n2. Negation of Existential Quantifications:")
 
-    print(f"- Negation of 'There exists a student who scored above 9 in math': {not_exists_student_high_math(data)}")
+    print(f"- Negation of 'There exists a student who scored above 9 in math': {results['not_exists_student_high_math']}")
     print("  Meaning: All students have math scores less than 9.")
 
-    print(f"- Negation of 'There exists a student who improved in CS over Math': {not_exists_student_improved_in_cs(data)}")
+    print(f"- Negation of 'There exists a student who improved in CS over Math': {results['not_exists_student_improved_in_cs']}")
     print("  Meaning: All students have CS scores less than or equal to their Math scores.")
 
     # 3. Negation of Combined/Nested Quantifications
     print("\n3. Negation of Combined/Nested Quantifications:")
 
-    print(f"- Negation of 'For every student, there exists a subject in which they scored above 6': {not_for_every_student_exists_subject_above_6(data)}")
+    print(f"- Negation of 'For every student, there exists a subject in which they scored above 6': {results['not_for_every_student_exists_subject_above_6']}")
     print("  Meaning: There exists at least one student who scored 6 or lower in all subjects.")
 
-    print(f"- Negation of 'For every student scoring below 6 in Math, there exists a subject where they scored above 6': {not_for_every_student_with_low_math_exists_subject_above_6(data)}")
+    print(f"- Negation of 'For every student scoring below 6 in Math, there exists a subject where they scored above 6': {results['not_for_every_student_with_low_math_exists_subject_above_6']}")
     print("  Meaning: There exists at least one student who has a Math score below 6 and also scored 6 or lower in all other subjects.")
 
 
@@ -226,8 +652,11 @@ if __name__ == "__main__":
         # Display results
         # display_predicates_results(data)
 
+        # evaluate every statement and its negation in a single scan
+        results = evaluate_statements(data)
+
         # evaluate quantified statements
-        evaluate_quantified_statements(data)
+        evaluate_quantified_statements(data, results)
 
         # evaluate negated statements
-        evaluate_negated_statements(data)
\ No newline at end of file
+        evaluate_negated_statements(data, results)
\ No newline at end of file
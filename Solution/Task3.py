@@ -1,8 +1,16 @@
 from Crypto.PublicKey import RSA
-from Crypto.Cipher import PKCS1_OAEP
+from Crypto.Cipher import AES, PKCS1_OAEP
+from Crypto.Random import get_random_bytes
+import io
+import os
+import struct
 import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
 import matplotlib.pyplot as plt
 
+import instrumentation
+
 
 def generate_keys(key_size=2048):
     """
@@ -16,6 +24,31 @@ def generate_keys(key_size=2048):
     return public_key, private_key
 
 
+# OAEP cipher objects by key, so they are built once per key instead of per
+# message. Only the most recently used keys are kept
+OAEP_CACHE_SIZE = 64
+_OAEP_CIPHERS = OrderedDict()
+
+
+def oaep_cipher(key):
+    """
+    Returns the cached PKCS1_OAEP cipher of a key.
+
+    :param key: RSA public or private key.
+    :return: PKCS1_OAEP cipher object.
+    """
+    cache_key = (key.n, key.e, key.has_private())
+    cipher = _OAEP_CIPHERS.get(cache_key)
+    if cipher is None:
+        cipher = _OAEP_CIPHERS[cache_key] = PKCS1_OAEP.new(key)
+        if len(_OAEP_CIPHERS) > OAEP_CACHE_SIZE:
+            _OAEP_CIPHERS.popitem(last=False)
+    else:
+        _OAEP_CIPHERS.move_to_end(cache_key)
+    return cipher
+
+
+@instrumentation.timed('task3_rsa_encrypt_seconds')
 def rsa_encrypt(message: bytes, public_key) -> bytes:
     """
     Encrypts a message using RSA and OAEP padding.
@@ -24,10 +57,10 @@ def rsa_encrypt(message: bytes, public_key) -> bytes:
     :param public_key: RSA public key for encryption.
     :return: Ciphertext bytes.
     """
-    cipher = PKCS1_OAEP.new(public_key)
-    return cipher.encrypt(message)
+    return oaep_cipher(public_key).encrypt(message)
 
 
+@instrumentation.timed('task3_rsa_decrypt_seconds')
 def rsa_decrypt(ciphertext: bytes, private_key) -> bytes:
     """
     Decrypts an RSA-encrypted message using OAEP padding.
@@ -36,8 +69,293 @@ def rsa_decrypt(ciphertext: bytes, private_key) -> bytes:
     :param private_key: RSA private key for decryption.
     :return: Decrypted plaintext bytes.
     """
-    cipher = PKCS1_OAEP.new(private_key)
-    return cipher.decrypt(ciphertext)
+    return oaep_cipher(private_key).decrypt(ciphertext)
+
+
+def encrypt_batch(messages, public_key) -> list:
+    """
+    Encrypts many messages with one OAEP cipher object.
+
+    :param messages: Iterable of plaintext bytes.
+    :param public_key: RSA public key for encryption.
+    :return: List of ciphertexts, in input order.
+    """
+    cipher = oaep_cipher(public_key)
+    return [cipher.encrypt(message) for message in messages]
+
+
+# Private key cipher of a BatchDecryptor worker process
+_worker_cipher = None
+
+
+def _init_decrypt_worker(private_pem):
+    global _worker_cipher
+    _worker_cipher = PKCS1_OAEP.new(RSA.import_key(private_pem))
+
+
+def _decrypt_in_worker(ciphertext):
+    return _worker_cipher.decrypt(ciphertext)
+
+
+class BatchDecryptor:
+    """
+    Process pool decrypting OAEP ciphertexts with one private key. Every
+    worker imports the key and builds its cipher once, when it starts, so a
+    decryptor can be kept around and reused across batches.
+    """
+
+    def __init__(self, private_key, workers=None, chunksize=256):
+        """
+        :param private_key: RSA private key for decryption.
+        :param workers: Number of worker processes (default: CPU count).
+        :param chunksize: Ciphertexts sent to a worker per task.
+        """
+        self.chunksize = chunksize
+        self.pool = ProcessPoolExecutor(max_workers=workers or os.cpu_count() or 1,
+                                        initializer=_init_decrypt_worker,
+                                        initargs=(private_key.export_key('PEM'),))
+
+    def decrypt(self, ciphertexts, chunksize=None) -> list:
+        """
+        Decrypts many ciphertexts across the pool.
+
+        :param ciphertexts: Iterable of ciphertext bytes.
+        :param chunksize: Overrides the chunk size of the decryptor.
+        :return: List of plaintexts, in input order.
+        :raises ValueError: If any ciphertext fails to decrypt.
+        """
+        return list(self.pool.map(_decrypt_in_worker, ciphertexts, chunksize=chunksize or self.chunksize))
+
+    def close(self):
+        self.pool.shutdown()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def decrypt_batch(ciphertexts, private_key, workers=None, chunksize=256) -> list:
+    """
+    Decrypts many ciphertexts, on a process pool when workers > 1 (default:
+    CPU count) and serially with one cipher object otherwise.
+
+    :param ciphertexts: Iterable of ciphertext bytes.
+    :param private_key: RSA private key for decryption.
+    :param workers: Number of worker processes.
+    :param chunksize: Ciphertexts sent to a worker per task.
+    :return: List of plaintexts, in input order.
+    """
+    ciphertexts = list(ciphertexts)
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(ciphertexts) <= chunksize:
+        cipher = oaep_cipher(private_key)
+        return [cipher.decrypt(ciphertext) for ciphertext in ciphertexts]
+    with BatchDecryptor(private_key, workers, chunksize) as decryptor:
+        return decryptor.decrypt(ciphertexts)
+
+
+# Hybrid format: header, then records of (length, final flag, ciphertext, tag).
+# Header = magic, chunk size, length of the wrapped key, RSA-OAEP wrapped AES
+# key and the nonce prefix. Chunk i is sealed with AES-GCM under the nonce
+# prefix + i, and its final flag is authenticated with the header, so records
+# cannot be reordered, dropped, truncated or spliced from another message.
+HYBRID_MAGIC = b'RSAG'
+HYBRID_CHUNK_SIZE = 1 << 20
+# Largest chunk size accepted, since a chunk is buffered until its tag is verified
+HYBRID_MAX_CHUNK_SIZE = 16 << 20
+# Ciphertext is read and decrypted in pieces of at most this many bytes
+_READ_SIZE = 1 << 16
+_HYBRID_HEADER = struct.Struct('>4sIH')
+_RECORD_HEADER = struct.Struct('>IB')
+_NONCE_PREFIX_SIZE = 8
+_TAG_SIZE = 16
+
+
+def _readinto_full(source, view):
+    """
+    Fills view from a file object, looping over short reads.
+
+    :return: Number of bytes read; less than len(view) only at end of file.
+    """
+    filled = 0
+    while filled < len(view):
+        count = source.readinto(view[filled:])
+        if not count:
+            break
+        filled += count
+    return filled
+
+
+def _as_reader(source):
+    # Bytes-like payloads are read through a memoryview, without copying them
+    if hasattr(source, 'readinto'):
+        return source
+    return _MemoryReader(source)
+
+
+class _MemoryReader:
+    def __init__(self, data):
+        self.view = memoryview(data).cast('B')
+        self.position = 0
+
+    def readinto(self, buffer):
+        count = min(len(buffer), len(self.view) - self.position)
+        buffer[:count] = self.view[self.position:self.position + count]
+        self.position += count
+        return count
+
+
+def _chunk_cipher(key, nonce_prefix, index, header, final):
+    cipher = AES.new(key, AES.MODE_GCM, nonce=nonce_prefix + struct.pack('>I', index), mac_len=_TAG_SIZE)
+    cipher.update(header + bytes([final]))
+    return cipher
+
+
+@instrumentation.timed('task3_hybrid_encrypt_seconds')
+def hybrid_encrypt_stream(source, target, public_key, chunk_size=HYBRID_CHUNK_SIZE) -> int:
+    """
+    Encrypts a payload of any size: a random AES-256 key is wrapped with
+    RSA-OAEP and the payload is sealed with AES-GCM in chunks of chunk_size
+    bytes, so memory stays bounded whatever the payload size.
+
+    :param source: Readable binary file object or bytes-like object (e.g. a memoryview).
+    :param target: Writable binary file object receiving the encrypted stream.
+    :param public_key: RSA public key wrapping the AES key.
+    :param chunk_size: Plaintext bytes per AES-GCM record, at most HYBRID_MAX_CHUNK_SIZE.
+    :return: Number of plaintext bytes encrypted.
+    """
+    if not 0 < chunk_size <= HYBRID_MAX_CHUNK_SIZE:
+        raise ValueError(f"chunk_size must be between 1 and {HYBRID_MAX_CHUNK_SIZE}")
+    key = get_random_bytes(32)
+    nonce_prefix = get_random_bytes(_NONCE_PREFIX_SIZE)
+    wrapped = PKCS1_OAEP.new(public_key).encrypt(key)
+    header = _HYBRID_HEADER.pack(HYBRID_MAGIC, chunk_size, len(wrapped)) + wrapped + nonce_prefix
+    target.write(header)
+
+    reader = _as_reader(source)
+    capacity = chunk_size
+    if isinstance(reader, _MemoryReader):
+        # No need for buffers larger than an in-memory payload
+        capacity = min(chunk_size, len(reader.view))
+    # Read one chunk ahead to know which chunk is the final one
+    current, ahead = bytearray(capacity), bytearray(capacity)
+    output = bytearray(capacity)
+    size = _readinto_full(reader, memoryview(current))
+    total = index = 0
+    while True:
+        next_size = _readinto_full(reader, memoryview(ahead)) if size == chunk_size else 0
+        final = next_size == 0
+        cipher = _chunk_cipher(key, nonce_prefix, index, header, final)
+        sealed = memoryview(output)[:size]
+        cipher.encrypt(memoryview(current)[:size], output=sealed)
+        target.write(_RECORD_HEADER.pack(size, final))
+        target.write(sealed)
+        target.write(cipher.digest())
+        total += size
+        if final:
+            return total
+        index += 1
+        if index >> 32:
+            raise ValueError("Payload too large for the chunk counter; use a larger chunk_size")
+        current, ahead, size = ahead, current, next_size
+
+
+@instrumentation.timed('task3_hybrid_decrypt_seconds')
+def hybrid_decrypt_stream(source, target, private_key) -> int:
+    """
+    Decrypts a stream written by hybrid_encrypt_stream. Each chunk is
+    authenticated before it is written to target. Records are read in pieces,
+    so buffers only grow with the ciphertext actually received, never with
+    the sizes claimed by the (untrusted) headers. The source must end with
+    the final record.
+
+    :param source: Readable binary file object or bytes-like object.
+    :param target: Writable binary file object receiving the plaintext.
+    :param private_key: RSA private key unwrapping the AES key.
+    :return: Number of plaintext bytes decrypted.
+    :raises ValueError: If the stream is malformed, truncated, followed by trailing data or tampered with.
+    """
+    reader = _as_reader(source)
+
+    def read_exact(size):
+        buffer = bytearray(size)
+        if _readinto_full(reader, memoryview(buffer)) != size:
+            raise ValueError("Truncated hybrid ciphertext")
+        return buffer
+
+    fixed = read_exact(_HYBRID_HEADER.size)
+    magic, chunk_size, wrapped_size = _HYBRID_HEADER.unpack(fixed)
+    if magic != HYBRID_MAGIC:
+        raise ValueError("Not a hybrid RSA/AES-GCM ciphertext")
+    if not 0 < chunk_size <= HYBRID_MAX_CHUNK_SIZE:
+        raise ValueError("Malformed hybrid ciphertext header")
+    rest = read_exact(wrapped_size + _NONCE_PREFIX_SIZE)
+    header = bytes(fixed + rest)
+    key = PKCS1_OAEP.new(private_key).decrypt(bytes(rest[:wrapped_size]))
+    nonce_prefix = bytes(rest[wrapped_size:])
+
+    # The plaintext buffer grows to the largest record received, at most chunk_size
+    piece = bytearray(min(chunk_size, _READ_SIZE))
+    tag = bytearray(_TAG_SIZE)
+    output = bytearray()
+    record = bytearray(_RECORD_HEADER.size)
+    total = index = 0
+    while True:
+        if _readinto_full(reader, memoryview(record)) != len(record):
+            raise ValueError("Truncated hybrid ciphertext")
+        size, final = _RECORD_HEADER.unpack(record)
+        if size > chunk_size or final > 1:
+            raise ValueError("Malformed hybrid ciphertext record")
+        cipher = _chunk_cipher(key, nonce_prefix, index, header, final)
+        filled = 0
+        while filled < size:
+            count = min(size - filled, len(piece))
+            if _readinto_full(reader, memoryview(piece)[:count]) != count:
+                raise ValueError("Truncated hybrid ciphertext")
+            if filled + count > len(output):
+                output.extend(bytes(filled + count - len(output)))
+            with memoryview(output) as view:
+                cipher.decrypt(memoryview(piece)[:count], output=view[filled:filled + count])
+            filled += count
+        if _readinto_full(reader, memoryview(tag)) != _TAG_SIZE:
+            raise ValueError("Truncated hybrid ciphertext")
+        cipher.verify(tag)
+        target.write(memoryview(output)[:size])
+        total += size
+        if final:
+            # Bytes past the final record would be spliced in, not authenticated
+            if _readinto_full(reader, memoryview(record)[:1]):
+                raise ValueError("Trailing data after final record")
+            return total
+        index += 1
+
+
+def hybrid_encrypt(message, public_key, chunk_size=HYBRID_CHUNK_SIZE) -> bytes:
+    """
+    Encrypts an in-memory message of any length with the hybrid scheme.
+
+    :param message: Plaintext bytes-like object.
+    :param public_key: RSA public key.
+    :return: Ciphertext bytes.
+    """
+    target = io.BytesIO()
+    hybrid_encrypt_stream(message, target, public_key, chunk_size)
+    return target.getvalue()
+
+
+def hybrid_decrypt(ciphertext, private_key) -> bytes:
+    """
+    Decrypts a message encrypted with hybrid_encrypt.
+
+    :param ciphertext: Ciphertext bytes-like object.
+    :param private_key: RSA private key.
+    :return: Decrypted plaintext bytes.
+    """
+    target = io.BytesIO()
+    hybrid_decrypt_stream(ciphertext, target, private_key)
+    return target.getvalue()
 
 
 def measure_timing(message: bytes, public_key, private_key) -> tuple:
@@ -104,13 +422,15 @@ def print_summary_table(results):
     print("-" * (sum(col_widths) + len(sep) * (len(header)-1) + 4))
 
 
-def plot_timings(lengths, enc_times, dec_times):
+def plot_timings(lengths, enc_times, dec_times, output_path=None):
     """
     Plots encryption and decryption times vs. plaintext length.
 
     :param lengths: List of message lengths in bytes.
     :param enc_times: Corresponding encryption times (s).
     :param dec_times: Corresponding decryption times (s).
+    :param output_path: Image file to save the plot to instead of showing it,
+        for headless use.
     """
     plt.figure(figsize=(10, 6))
     plt.plot(lengths, enc_times, label='Encryption Time', marker='o')
@@ -121,7 +441,11 @@ def plot_timings(lengths, enc_times, dec_times):
     plt.legend()
     plt.grid(True)
     plt.tight_layout()
-    plt.show()
+    if output_path is None:
+        plt.show()
+    else:
+        plt.savefig(output_path)
+        plt.close()
 
 
 if __name__ == '__main__':
@@ -0,0 +1,222 @@
+from collections import Counter
+
+from Task1 import build_dag, postfix_tokens, postfix_variables, OPERATORS, CONSTANTS
+
+# Node ids of the two terminals
+FALSE = 0
+TRUE = 1
+
+
+class BDD:
+    """
+    Reduced ordered binary decision diagram manager.
+    Every node is stored once in the unique table, so two formulas built in the
+    same manager are equivalent exactly when they have the same node id.
+    """
+
+    def __init__(self, order):
+        # order: variable names, first name is tested at the root
+        self.order = list(order)
+        self.level = {var: i for i, var in enumerate(self.order)}
+        terminal_level = len(self.order)
+        # nodes[u] = (level, low, high); terminals sit below every variable
+        self.nodes = [(terminal_level, None, None), (terminal_level, None, None)]
+        self.unique = {}    # (level, low, high) -> node id
+        self.computed = {}  # (op, u, v) -> node id, the apply cache
+
+    def mk(self, level, low, high):
+        """Return the node (level, low, high), creating it only if needed."""
+        # Reduction rule: a test whose branches agree is redundant
+        if low == high:
+            return low
+        key = (level, low, high)
+        u = self.unique.get(key)
+        if u is None:
+            u = self.unique[key] = len(self.nodes)
+            self.nodes.append(key)
+        return u
+
+    def var(self, name):
+        """BDD of a single variable."""
+        return self.mk(self.level[name], FALSE, TRUE)
+
+    def negate(self, u):
+        return self.apply('=', u, FALSE)
+
+    def _apply_shortcut(self, op, u, v):
+        # Result of a terminal case or of a cached pair, or None if u and v
+        # must be expanded
+        if u <= TRUE and v <= TRUE:
+            a, b = u == TRUE, v == TRUE
+            if op == '&':
+                return TRUE if a and b else FALSE
+            if op == '|':
+                return TRUE if a or b else FALSE
+            if op == '>':
+                return TRUE if (not a) or b else FALSE
+            return TRUE if a == b else FALSE
+        if op == '&' and (u == FALSE or v == FALSE):
+            return FALSE
+        if op == '|' and (u == TRUE or v == TRUE):
+            return TRUE
+        if op in ('&', '|') and u == v:
+            return u
+        if op == '>' and (u == FALSE or v == TRUE):
+            return TRUE
+        return self.computed.get((op, u, v))
+
+    def apply(self, op, u, v):
+        """
+        Combine two BDDs with a binary operator (&, |, >, =).
+        Results are memoized in the computed table, so the cost is bounded by
+        the product of the two BDD sizes rather than by 2^n. The Shannon
+        expansion runs on an explicit stack, so deep BDDs (thousands of
+        variables) do not hit the recursion limit.
+        """
+        stack = [(u, v, False)]  # (u, v, children already evaluated)
+        results = []
+        while stack:
+            u, v, expanded = stack.pop()
+            # Commutative operators share one cache entry per unordered pair
+            if op != '>' and v < u:
+                u, v = v, u
+            level_u, low_u, high_u = self.nodes[u]
+            level_v, low_v, high_v = self.nodes[v]
+            level = min(level_u, level_v)
+            if expanded:
+                high = results.pop()
+                low = results.pop()
+                result = self.computed[(op, u, v)] = self.mk(level, low, high)
+                results.append(result)
+                continue
+
+            result = self._apply_shortcut(op, u, v)
+            if result is not None:
+                results.append(result)
+                continue
+            # Shannon expansion on the topmost variable of the two operands
+            if level_u != level:
+                low_u = high_u = u
+            if level_v != level:
+                low_v = high_v = v
+            stack.append((u, v, True))
+            stack.append((high_u, high_v, False))
+            stack.append((low_u, low_v, False))
+        return results[0]
+
+    def from_postfix(self, postfix):
+        """Build the BDD of a postfix expression as returned by Infix2Postfix."""
+        variables, nodes, root = build_dag(postfix)
+        values = []
+        for op, left, right in nodes:
+            if op == 'var':
+                values.append(self.var(variables[left]))
+            elif op == 'const':
+                values.append(TRUE if left else FALSE)
+            elif op == '~':
+                values.append(self.negate(values[left]))
+            else:
+                values.append(self.apply(op, values[left], values[right]))
+        return values[root]
+
+    def count_models(self, u, variables=None):
+        """
+        Number of assignments to `variables` (default: every variable of the
+        manager) that make u true. u must only depend on those variables.
+        """
+        if variables is None:
+            variables = self.order
+        levels = sorted(self.level[var] for var in variables)
+        # rank[l] = how many of the counted variables are tested above level l
+        rank = {}
+        for i, level in enumerate(levels):
+            rank[level] = i
+        rank[len(self.order)] = len(levels)
+
+        # counts[w] = models of w over the counted variables at or below its
+        # level, filled children first with an explicit stack
+        counts = {FALSE: 0, TRUE: 1}
+        stack = [u]
+        while stack:
+            w = stack[-1]
+            if w in counts:
+                stack.pop()
+                continue
+            level, low, high = self.nodes[w]
+            missing = [child for child in (low, high) if child not in counts]
+            if missing:
+                stack.extend(missing)
+                continue
+            stack.pop()
+            counts[w] = (counts[low] << (rank[self.nodes[low][0]] - rank[level] - 1)) + \
+                        (counts[high] << (rank[self.nodes[high][0]] - rank[level] - 1))
+
+        return counts[u] << rank[self.nodes[u][0]]
+
+    def any_model(self, u):
+        """One satisfying assignment of u as a dict, or None if u is FALSE."""
+        if u == FALSE:
+            return None
+        model = {}
+        while u > TRUE:
+            level, low, high = self.nodes[u]
+            # Any branch that is not FALSE leads to a model
+            if high != FALSE:
+                model[self.order[level]] = True
+                u = high
+            else:
+                model[self.order[level]] = False
+                u = low
+        return model
+
+
+def order_variables(postfix, heuristic='appearance'):
+    """
+    Choose a variable order for a postfix expression.
+    'sorted' uses the same order as the truth table, 'appearance' follows the
+    first occurrence in the formula (which keeps related variables close), and
+    'frequency' tests the most often used variables first.
+    """
+    if heuristic == 'sorted':
+        return postfix_variables(postfix)
+    operands = [token for token in postfix_tokens(postfix)
+                if token not in OPERATORS and token not in CONSTANTS]
+    if heuristic == 'appearance':
+        return list(dict.fromkeys(operands))
+    if heuristic == 'frequency':
+        counts = Counter(operands)
+        return sorted(counts, key=lambda var: (-counts[var], var))
+    raise ValueError(f"Unknown variable ordering heuristic: {heuristic!r}")
+
+
+def _merged_order(postfixes, heuristic):
+    # Variables of all formulas, in the order the heuristic picks for each
+    order = []
+    for postfix in postfixes:
+        order.extend(order_variables(postfix, heuristic))
+    return list(dict.fromkeys(order))
+
+
+def is_tautology(postfix, heuristic='appearance'):
+    manager = BDD(order_variables(postfix, heuristic))
+    return manager.from_postfix(postfix) == TRUE
+
+
+def is_satisfiable(postfix, heuristic='appearance'):
+    manager = BDD(order_variables(postfix, heuristic))
+    return manager.from_postfix(postfix) != FALSE
+
+
+def equivalent(postfix_a, postfix_b, heuristic='appearance'):
+    """True if both postfix expressions have the same truth table."""
+    manager = BDD(_merged_order([postfix_a, postfix_b], heuristic))
+    return manager.from_postfix(postfix_a) == manager.from_postfix(postfix_b)
+
+
+def count_models(postfix, heuristic='appearance'):
+    """
+    Number of rows of the truth table of postfix that evaluate to True,
+    computed from the BDD without enumerating the 2^n rows.
+    """
+    manager = BDD(order_variables(postfix, heuristic))
+    return manager.count_models(manager.from_postfix(postfix))
@@ -0,0 +1,306 @@
+import json
+import os
+
+import numpy as np
+
+from Task2 import complete_lines_end, iter_student_chunks
+
+# Each container holds the rows sharing the same high 16 bits of the row number
+CONTAINER_BITS = 16
+CONTAINER_SIZE = 1 << CONTAINER_BITS
+# Containers with more rows than this are stored as a bitmap instead of a sorted array
+ARRAY_LIMIT = 4096
+# Number of set bits of every byte value
+_POPCOUNT = np.unpackbits(np.arange(256, dtype=np.uint8)[:, None], axis=1).sum(axis=1)
+
+
+def _to_bitmap(container):
+    # Packed 8 KiB bitmap of a container
+    kind, values = container
+    if kind == 'bitmap':
+        return values
+    bits = np.zeros(CONTAINER_SIZE, dtype=bool)
+    bits[values] = True
+    return np.packbits(bits, bitorder='little')
+
+
+def _to_array(container):
+    # Sorted uint16 row offsets of a container
+    kind, values = container
+    if kind == 'array':
+        return values
+    return np.flatnonzero(np.unpackbits(values, bitorder='little')).astype(np.uint16)
+
+
+def _optimize(bitmap):
+    # Pick the smaller representation, or None for an empty container
+    count = int(_POPCOUNT[bitmap].sum())
+    if count == 0:
+        return None
+    if count <= ARRAY_LIMIT:
+        return 'array', np.flatnonzero(np.unpackbits(bitmap, bitorder='little')).astype(np.uint16)
+    return 'bitmap', bitmap
+
+
+def _cardinality(container):
+    kind, values = container
+    if kind == 'array':
+        return len(values)
+    return int(_POPCOUNT[values].sum())
+
+
+def _full_bitmap(size):
+    # Packed bitmap with the first size rows of a container set
+    bits = np.zeros(CONTAINER_SIZE, dtype=bool)
+    bits[:size] = True
+    return np.packbits(bits, bitorder='little')
+
+
+class RoaringBitmap:
+    """
+    Compressed set of row numbers in the style of Roaring bitmaps: rows are
+    split into containers of 2^16 rows, each stored as a sorted uint16 array
+    when sparse or as a packed bitmap when dense.
+    """
+
+    def __init__(self, containers=None):
+        self.containers = containers or {}  # high bits -> (kind, values)
+
+    @classmethod
+    def from_mask(cls, mask, offset=0):
+        bitmap = cls()
+        bitmap.add_mask(mask, offset)
+        return bitmap
+
+    def add_mask(self, mask, offset=0):
+        """Add the rows offset + i for which mask[i] is True."""
+        rows = np.flatnonzero(np.asarray(mask, dtype=bool)).astype(np.int64) + offset
+        if len(rows) == 0:
+            return
+        highs = rows >> CONTAINER_BITS
+        keys, starts = np.unique(highs, return_index=True)
+        ends = list(starts[1:]) + [len(rows)]
+        for key, begin, end in zip(keys.tolist(), starts, ends):
+            lows = (rows[begin:end] & (CONTAINER_SIZE - 1)).astype(np.uint16)
+            if key in self.containers:
+                # Appending to a partially filled container
+                lows = np.union1d(_to_array(self.containers[key]), lows).astype(np.uint16)
+            if len(lows) <= ARRAY_LIMIT:
+                self.containers[key] = ('array', lows)
+            else:
+                self.containers[key] = ('bitmap', _to_bitmap(('array', lows)))
+
+    def _combine(self, other, op, keys):
+        containers = {}
+        for key in keys:
+            left = self.containers.get(key)
+            right = other.containers.get(key)
+            if left is None or right is None:
+                # Missing containers are empty
+                if op is np.bitwise_or:
+                    containers[key] = left or right
+                elif op is _andnot and right is None:
+                    containers[key] = left
+                continue
+            if op is np.bitwise_and and left[0] == 'array' and right[0] == 'array':
+                values = np.intersect1d(left[1], right[1], assume_unique=True)
+                if len(values):
+                    containers[key] = ('array', values.astype(np.uint16))
+                continue
+            combined = _optimize(op(_to_bitmap(left), _to_bitmap(right)))
+            if combined is not None:
+                containers[key] = combined
+        return RoaringBitmap(containers)
+
+    def __and__(self, other):
+        return self._combine(other, np.bitwise_and, self.containers.keys() & other.containers.keys())
+
+    def __or__(self, other):
+        return self._combine(other, np.bitwise_or, self.containers.keys() | other.containers.keys())
+
+    def __sub__(self, other):
+        return self._combine(other, _andnot, self.containers.keys())
+
+    def complement(self, rows):
+        """Rows in [0, rows) that are not in the set."""
+        containers = {}
+        full = _full_bitmap(CONTAINER_SIZE)
+        for key in range(-(-rows // CONTAINER_SIZE)):
+            size = min(rows - (key << CONTAINER_BITS), CONTAINER_SIZE)
+            universe = full if size == CONTAINER_SIZE else _full_bitmap(size)
+            if key not in self.containers:
+                containers[key] = ('bitmap', universe)
+                continue
+            combined = _optimize(_andnot(universe, _to_bitmap(self.containers[key])))
+            if combined is not None:
+                containers[key] = combined
+        return RoaringBitmap(containers)
+
+    def __len__(self):
+        return sum(_cardinality(container) for container in self.containers.values())
+
+    def first(self):
+        """Smallest row in the set, or None if it is empty."""
+        if not self.containers:
+            return None
+        key = min(self.containers)
+        return (key << CONTAINER_BITS) + int(_to_array(self.containers[key])[0])
+
+    def to_rows(self):
+        parts = [(key << CONTAINER_BITS) + _to_array(self.containers[key]).astype(np.int64)
+                 for key in sorted(self.containers)]
+        return np.concatenate(parts) if parts else np.zeros(0, dtype=np.int64)
+
+
+def _andnot(left, right):
+    return np.bitwise_and(left, np.bitwise_not(right))
+
+
+class BitmapIndex:
+    """
+    One RoaringBitmap per registered Task2 predicate over the students table.
+    Compound and quantified queries are answered with bitwise operations on
+    the bitmaps. Rows appended to the table are indexed incrementally, and
+    the index is persisted in a compressed .npz file.
+    """
+
+    def __init__(self, predicates=None):
+        self.predicates = {}  # name -> Predicate
+        self.bitmaps = {}     # name -> RoaringBitmap
+        self.indexed = {}     # name -> number of rows already indexed
+        self.rows = 0
+        self.offset = None    # byte offset of row self.rows in the CSV, once known
+        for pred in (predicates or []):
+            self.register(pred)
+
+    def register(self, pred):
+        """
+        Register a base predicate (such as Task2.is_passing). A predicate added
+        to an existing index is filled in by the next update. Predicates are
+        stored by name, so a name can only be registered for one predicate.
+        """
+        registered = self.predicates.get(pred.name)
+        if registered is not None and registered.key != pred.key:
+            raise ValueError(f"Another predicate is already registered as {pred.name!r}")
+        self.predicates[pred.name] = pred
+        self.bitmaps.setdefault(pred.name, RoaringBitmap())
+        self.indexed.setdefault(pred.name, 0)
+
+    def append(self, chunk):
+        """Index a DataFrame chunk whose index holds the row numbers."""
+        if len(chunk) == 0:
+            return
+        start = int(chunk.index[0])
+        for name, pred in self.predicates.items():
+            # Skip rows this predicate has already seen
+            fresh = chunk.iloc[max(self.indexed[name] - start, 0):]
+            if len(fresh):
+                self.bitmaps[name].add_mask(pred.mask(fresh), int(fresh.index[0]))
+                self.indexed[name] = int(fresh.index[-1]) + 1
+        self.rows = max(self.rows, int(chunk.index[-1]) + 1)
+        # Rows indexed outside update leave the CSV offset unknown
+        self.offset = None
+
+    def update(self, file_path='students.csv', chunk_size=1 << 20):
+        """
+        Index the rows appended to file_path since the last update. When every
+        predicate is up to date, parsing seeks to the byte offset where the
+        last update stopped; a predicate registered since then makes the file
+        be read again from its first unindexed row. Only complete lines are
+        indexed: a last line without its newline is left for a later update.
+        """
+        # Rows appended while this update runs, including a line a writer has
+        # not finished yet, are left for the next one
+        end = complete_lines_end(file_path)
+        # The cache holds every line of the file, the unterminated one included
+        use_cache = end == os.path.getsize(file_path)
+        start = min(self.indexed.values(), default=self.rows)
+        offset = self.offset if start == self.rows else None
+        for chunk in iter_student_chunks(file_path, chunk_size, use_cache, start=start, offset=offset, end=end):
+            self.append(chunk)
+        self.offset = end
+
+    def bitmap(self, pred):
+        """
+        Bitmap of the rows satisfying a predicate built from registered ones
+        with &, | and ~.
+        """
+        if pred.op is None:
+            registered = self.predicates.get(pred.name)
+            if registered is None or registered.key != pred.key:
+                raise KeyError(f"Predicate {pred.name!r} is not registered")
+            return self.bitmaps[pred.name]
+        if pred.op == '~':
+            return self.bitmap(pred.operands[0]).complement(self.rows)
+        left = self.bitmap(pred.operands[0])
+        right = self.bitmap(pred.operands[1])
+        return left & right if pred.op == '&' else left | right
+
+    def count(self, pred):
+        return len(self.bitmap(pred))
+
+    def forall(self, pred):
+        # ∀x P(x): no row outside the bitmap of P
+        return self.count(pred) == self.rows
+
+    def exists(self, pred):
+        return self.bitmap(pred).first() is not None
+
+    def witness(self, pred):
+        """First row satisfying the predicate, or None."""
+        return self.bitmap(pred).first()
+
+    def save(self, path):
+        """Persist the bitmaps in a compressed .npz file."""
+        arrays = {}
+        meta = {'rows': self.rows, 'offset': self.offset, 'indexed': self.indexed, 'predicates': list(self.bitmaps)}
+        for number, name in enumerate(self.bitmaps):
+            containers = self.bitmaps[name].containers
+            keys = sorted(containers)
+            arrays[f'keys{number}'] = np.array(keys, dtype=np.int64)
+            arrays[f'kinds{number}'] = np.array([containers[key][0] == 'bitmap' for key in keys], dtype=bool)
+            arrays[f'lengths{number}'] = np.array([len(containers[key][1]) for key in keys], dtype=np.int64)
+            arrays[f'arrays{number}'] = np.concatenate(
+                [containers[key][1] for key in keys if containers[key][0] == 'array'] or [np.zeros(0, np.uint16)])
+            arrays[f'bitmaps{number}'] = np.concatenate(
+                [containers[key][1] for key in keys if containers[key][0] == 'bitmap'] or [np.zeros(0, np.uint8)])
+        arrays['meta'] = np.array(json.dumps(meta))
+        with open(path, 'wb') as file:
+            np.savez_compressed(file, **arrays)
+
+    @classmethod
+    def load(cls, path, predicates):
+        """
+        Load an index saved with save. predicates are the Predicate objects to
+        attach to the stored bitmaps, by name; new ones are registered empty.
+        """
+        index = cls()
+        with np.load(path) as arrays:
+            meta = json.loads(str(arrays['meta']))
+            index.rows = meta['rows']
+            index.offset = meta.get('offset')
+            by_name = {pred.name: pred for pred in predicates}
+            for number, name in enumerate(meta['predicates']):
+                if name not in by_name:
+                    continue
+                # Every access to an .npz member decompresses it again, so each
+                # is read once; containers get copies so that they do not keep
+                # the whole member alive
+                bitmap_values = arrays[f'bitmaps{number}']
+                array_values = arrays[f'arrays{number}']
+                containers = {}
+                array_pos = bitmap_pos = 0
+                for key, is_bitmap, length in zip(arrays[f'keys{number}'].tolist(), arrays[f'kinds{number}'],
+                                                   arrays[f'lengths{number}'].tolist()):
+                    if is_bitmap:
+                        containers[key] = ('bitmap', bitmap_values[bitmap_pos:bitmap_pos + length].copy())
+                        bitmap_pos += length
+                    else:
+                        containers[key] = ('array', array_values[array_pos:array_pos + length].copy())
+                        array_pos += length
+                index.predicates[name] = by_name[name]
+                index.bitmaps[name] = RoaringBitmap(containers)
+                index.indexed[name] = meta['indexed'][name]
+        for pred in predicates:
+            index.register(pred)
+        return index
@@ -0,0 +1,134 @@
+import argparse
+import json
+import os
+import sys
+from collections import OrderedDict, deque
+from concurrent.futures import ProcessPoolExecutor
+
+from Task1 import Infix2Postfix, Postfix2Bitmask, postfix_variables
+from bdd import count_models
+
+# Above this many variables the BDD counts models instead of the bit columns
+MAX_BITMASK_VARS = 20
+
+
+def classify_expression(infix):
+    """
+    Classify one infix expression as a tautology, contradiction or contingent.
+    Output: dict with the expression, its postfix form, the number of rows of
+    its truth table and how many of them are True, ready to dump as JSON.
+    """
+    try:
+        postfix = Infix2Postfix(infix)
+        variables = postfix_variables(postfix)
+        if len(variables) <= MAX_BITMASK_VARS:
+            _, column = Postfix2Bitmask(postfix)
+            true_rows = column.bit_count()
+        else:
+            true_rows = count_models(postfix)
+    except (ValueError, KeyError) as e:
+        return {'expression': infix, 'error': str(e)}
+    except Exception as e:
+        # Any other failure (e.g. RecursionError, MemoryError) is reported for
+        # this line only instead of aborting the whole stream
+        return {'expression': infix, 'error': f"{type(e).__name__}: {e}"}
+
+    rows = 1 << len(variables)
+    if true_rows == rows:
+        kind = 'tautology'
+    elif true_rows == 0:
+        kind = 'contradiction'
+    else:
+        kind = 'contingent'
+    return {
+        'expression': infix,
+        'postfix': postfix,
+        'variables': len(variables),
+        'class': kind,
+        'true_rows': true_rows,
+        'rows': rows,
+    }
+
+
+def _classify_batch(expressions):
+    return [classify_expression(infix) for infix in expressions]
+
+
+def classify_stream(lines, workers=None, batch_size=1000, cache_size=100000):
+    """
+    Classify expressions streamed one per line and yield results in input order.
+    Blank lines are skipped. Batches are classified on a process pool with a
+    bounded number of batches in flight, and identical expressions are only
+    classified once thanks to an LRU cache of recent results.
+    """
+    workers = workers or os.cpu_count() or 1
+    cache = OrderedDict()  # expression -> result, least recently used first
+    pending = set()        # expressions already sent to a worker
+    in_flight = deque()    # (batch, misses, future) in submission order
+
+    def remember(infix, result):
+        cache[infix] = result
+        cache.move_to_end(infix)
+        if len(cache) > cache_size:
+            cache.popitem(last=False)
+
+    def drain():
+        batch, misses, future = in_flight.popleft()
+        computed = dict(zip(misses, future.result()))
+        for infix, result in computed.items():
+            pending.discard(infix)
+            remember(infix, result)
+        for infix in batch:
+            result = computed.get(infix) or cache.get(infix)
+            if result is None:
+                # Evicted before this batch was drained; recompute inline
+                result = classify_expression(infix)
+                remember(infix, result)
+            yield result
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        batch = []
+        for line in lines:
+            infix = line.strip()
+            if not infix:
+                continue
+            batch.append(infix)
+            if len(batch) < batch_size:
+                continue
+
+            misses = [infix for infix in dict.fromkeys(batch) if infix not in cache and infix not in pending]
+            pending.update(misses)
+            in_flight.append((batch, misses, pool.submit(_classify_batch, misses)))
+            batch = []
+            # Bound memory: wait for the oldest batch once the pool is saturated
+            if len(in_flight) > 2 * workers:
+                yield from drain()
+
+        if batch:
+            misses = [infix for infix in dict.fromkeys(batch) if infix not in cache and infix not in pending]
+            pending.update(misses)
+            in_flight.append((batch, misses, pool.submit(_classify_batch, misses)))
+        while in_flight:
+            yield from drain()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Classify logical expressions (one per line) as tautology, contradiction or contingent.")
+    parser.add_argument('input', nargs='?', default='-', help="file with one infix expression per line (default: stdin)")
+    parser.add_argument('-o', '--output', default='-', help="JSONL output file (default: stdout)")
+    parser.add_argument('--workers', type=int, default=None, help="number of worker processes")
+    parser.add_argument('--batch-size', type=int, default=1000, help="expressions per worker task")
+    parser.add_argument('--cache-size', type=int, default=100000, help="number of distinct results to remember")
+    args = parser.parse_args()
+
+    source = sys.stdin if args.input == '-' else open(args.input, encoding='utf-8')
+    target = sys.stdout if args.output == '-' else open(args.output, 'w', encoding='utf-8')
+    try:
+        for result in classify_stream(source, args.workers, args.batch_size, args.cache_size):
+            target.write(json.dumps(result, ensure_ascii=False) + '\n')
+    finally:
+        if source is not sys.stdin:
+            source.close()
+        if target is not sys.stdout:
+            target.close()
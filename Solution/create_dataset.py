@@ -1,8 +1,14 @@
+import argparse
 import csv
+import os
 import pandas as pd
 import random
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime, timedelta
 
+import numpy as np
+
 # Create a dataset of students with random data
 def create_dataset(file_path='students.csv'):
     students = []
@@ -51,4 +57,158 @@ def create_dataset(file_path='students.csv'):
     print(f"Create a {file_path} with records.")
     return file_path
 
-create_dataset('students.csv')
+
+FIRST_NAMES = ["Nam", "Minh", "Hoa", "Lan", "Anh", "Tuan", "Linh", "Hai", "Mai", "Duc"]
+LAST_NAMES = ["Nguyen", "Tran", "Le", "Pham", "Hoang", "Vo", "Dang", "Bui", "Do", "Dinh"]
+BIRTH_START = datetime(2000, 1, 1)
+BIRTH_END = datetime(2005, 12, 31)
+COLUMNS = ["StudentID", "StudentName", "DayOfBirth", "Math", "CS", "Eng"]
+
+# The four score cohorts of create_dataset, by share of the rows in file order.
+# A score is uniform on (low, high); ('Math', low, high) adds a uniform bonus to
+# the Math score. Scores are rounded to one decimal and clipped to [0, 10].
+COHORTS = [
+    {'share': 0.25, 'Math': (8.0, 10.0), 'CS': (8.0, 10.0), 'Eng': (8.0, 10.0)},
+    {'share': 0.25, 'Math': (9.0, 10.0), 'CS': (5.0, 8.0), 'Eng': (5.0, 8.0)},
+    {'share': 0.25, 'Math': (4.0, 7.0), 'CS': ('Math', 1.0, 3.0), 'Eng': (5.0, 9.0)},
+    {'share': 0.25, 'Math': (3.0, 5.5), 'CS': (3.0, 5.5), 'Eng': (5.0, 9.0)},
+]
+
+
+def _cohort_bounds(rows, cohorts):
+    # First row after each cohort
+    shares = np.cumsum([cohort['share'] for cohort in cohorts])
+    return np.rint(shares / shares[-1] * rows).astype(np.int64)
+
+
+def generate_chunk(start, stop, rows, seed=0, cohorts=COHORTS):
+    """
+    Generate rows [start, stop) of a dataset of rows students with NumPy.
+    Every chunk draws from its own SeedSequence child of seed, so the data
+    only depends on seed and the chunk boundaries, not on the worker running it.
+    Output: dict from column name to numpy array.
+    """
+    rng = np.random.default_rng(np.random.SeedSequence(seed, spawn_key=(start,)))
+    size = stop - start
+    width = max(3, len(str(rows)))
+    numbers = np.arange(start + 1, stop + 1).astype(str)
+    ids = np.char.add('SV', np.char.zfill(numbers, width))
+
+    names = np.array([f"{last} {first}" for last in LAST_NAMES for first in FIRST_NAMES])
+    student_names = names[rng.integers(0, len(names), size)]
+
+    days = (BIRTH_END - BIRTH_START).days
+    dates = np.datetime64(BIRTH_START.date()) + np.arange(days)
+    # Format each possible date once and look the rows up
+    labels = np.array([str(date.item().strftime("%d/%m/%Y")) for date in dates])
+    birth = labels[rng.integers(0, days, size)]
+
+    scores = {column: np.empty(size) for column in ("Math", "CS", "Eng")}
+    bounds = _cohort_bounds(rows, cohorts)
+    positions = np.arange(start, stop)
+    cohort_of = np.searchsorted(bounds, positions, side='right')
+    for k, cohort in enumerate(cohorts):
+        selected = cohort_of == k
+        count = int(selected.sum())
+        if not count:
+            continue
+        for column in ("Math", "CS", "Eng"):
+            spec = cohort[column]
+            if isinstance(spec[0], str):
+                base, low, high = spec
+                values = scores[base][selected] + rng.uniform(low, high, count)
+            else:
+                values = rng.uniform(spec[0], spec[1], count)
+            # Clipped so that custom cohorts stay in the range _SCORE_LABELS covers
+            scores[column][selected] = np.clip(np.round(values, 1), 0.0, 10.0)
+
+    return {"StudentID": ids, "StudentName": student_names, "DayOfBirth": birth, **scores}
+
+
+# CSV text of every score, indexed by ten times the score
+_SCORE_LABELS = np.array([f"{tenths / 10}" for tenths in range(101)], dtype=object)
+
+
+def _format_csv(columns):
+    # CSV lines of a chunk; scores are looked up instead of formatted one by one
+    parts = []
+    for name in COLUMNS:
+        values = columns[name]
+        if values.dtype.kind == 'f':
+            values = _SCORE_LABELS[np.rint(values * 10).astype(np.intp)]
+        parts.append(values.tolist())
+    return ('\n'.join(map(','.join, zip(*parts))) + '\n').encode('utf-8')
+
+
+def _generate_part(start, stop, rows, seed, cohorts, file_format):
+    columns = generate_chunk(start, stop, rows, seed, cohorts)
+    if file_format == 'csv':
+        return _format_csv(columns)
+    return columns
+
+
+def generate_dataset(file_path, rows, seed=0, chunk_size=1 << 20, workers=None, file_format=None, cohorts=COHORTS):
+    """
+    Write a reproducible dataset of rows students to file_path.
+    Chunks of chunk_size rows are generated on a process pool and written in
+    order, with a bounded number of chunks in flight so memory does not grow
+    with rows. file_format is 'csv' or 'parquet' (needs pyarrow); by default
+    it follows the file extension.
+    """
+    file_format = file_format or ('parquet' if file_path.endswith('.parquet') else 'csv')
+    if file_format == 'parquet':
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise ValueError("Writing parquet requires pyarrow") from None
+    elif file_format != 'csv':
+        raise ValueError(f"Unknown dataset format: {file_format!r}")
+
+    workers = workers or os.cpu_count() or 1
+    with open(file_path, 'wb') as file, ProcessPoolExecutor(max_workers=workers) as pool:
+        writer = None
+        if file_format == 'csv':
+            file.write((','.join(COLUMNS) + '\n').encode('utf-8'))
+
+        def write(part):
+            nonlocal writer
+            if file_format == 'csv':
+                file.write(part)
+                return
+            table = pa.table(part)
+            if writer is None:
+                writer = pq.ParquetWriter(file, table.schema)
+            writer.write_table(table)
+
+        in_flight = deque()
+        for start in range(0, rows, chunk_size):
+            stop = min(start + chunk_size, rows)
+            in_flight.append(pool.submit(_generate_part, start, stop, rows, seed, cohorts, file_format))
+            # Bound memory: write the oldest chunk once the pool is saturated
+            if len(in_flight) > 2 * workers:
+                write(in_flight.popleft().result())
+        while in_flight:
+            write(in_flight.popleft().result())
+        if writer is not None:
+            writer.close()
+
+    print(f"Create a {file_path} with {rows} records.")
+    return file_path
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Create a synthetic students dataset.")
+    parser.add_argument('output', nargs='?', default='students.csv', help="output file (default: students.csv)")
+    parser.add_argument('--rows', type=int, default=None,
+                        help="number of students, generated with NumPy (default: the 20-student dataset)")
+    parser.add_argument('--seed', type=int, default=0, help="random seed of the generator")
+    parser.add_argument('--chunk-size', type=int, default=1 << 20, help="rows generated per worker task")
+    parser.add_argument('--workers', type=int, default=None, help="number of worker processes")
+    parser.add_argument('--format', choices=['csv', 'parquet'], default=None, help="output format (default: from extension)")
+    args = parser.parse_args()
+
+    if args.rows is None:
+        create_dataset(args.output)
+    else:
+        generate_dataset(args.output, args.rows, args.seed, args.chunk_size, args.workers, args.format)
@@ -0,0 +1,340 @@
+import argparse
+import asyncio
+import base64
+import json
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from Crypto.PublicKey import RSA
+
+from Task3 import hybrid_decrypt, hybrid_encrypt, oaep_cipher
+from keystore import load_or_create_keys
+
+# Requests are JSON lines: {"id": ..., "op": ..., "data": base64}. Responses
+# carry the same id with {"ok": true, "data": base64} or {"ok": false, "error": ...}.
+OPERATIONS = ('encrypt', 'decrypt', 'hybrid_encrypt', 'hybrid_decrypt')
+# Latency samples kept per operation for the percentiles
+LATENCY_WINDOW = 10000
+
+# Keys of a service worker process
+_worker_keys = None
+
+
+def _init_worker(private_pem):
+    global _worker_keys
+    private_key = RSA.import_key(private_pem)
+    _worker_keys = (private_key.publickey(), private_key)
+
+
+def _run_batch(op, payloads):
+    """
+    Runs one operation over a batch in a worker process. Errors are reported
+    per item so that one bad ciphertext does not fail the whole batch.
+
+    :return: List of (ok, result bytes or error message), in input order.
+    """
+    public_key, private_key = _worker_keys
+    results = []
+    for payload in payloads:
+        try:
+            if op == 'encrypt':
+                results.append((True, oaep_cipher(public_key).encrypt(payload)))
+            elif op == 'decrypt':
+                results.append((True, oaep_cipher(private_key).decrypt(payload)))
+            elif op == 'hybrid_encrypt':
+                results.append((True, hybrid_encrypt(payload, public_key)))
+            else:
+                results.append((True, hybrid_decrypt(payload, private_key)))
+        except (ValueError, TypeError) as e:
+            results.append((False, str(e)))
+        except MemoryError:
+            results.append((False, "out of memory"))
+    return results
+
+
+def _percentile(ordered, q):
+    return ordered[min(int(len(ordered) * q), len(ordered) - 1)]
+
+
+class EncryptionService:
+    """
+    Asyncio service holding one RSA key pair. Concurrent requests for the
+    same operation are coalesced into micro-batches of up to max_batch items
+    (waiting at most max_delay seconds for a batch to fill) and run on a
+    process pool. At most two batches per worker are in flight and
+    max_pending requests wait per operation; beyond that the service stops
+    reading from clients. Requests not answered within timeout seconds get
+    a timeout error.
+    """
+
+    def __init__(self, private_key, workers=None, max_batch=64, max_delay=0.002,
+                 max_pending=1024, timeout=5.0, max_message=64 << 20):
+        self.private_pem = private_key.export_key('PEM')
+        self.workers = workers or os.cpu_count() or 1
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self.max_pending = max_pending
+        self.timeout = timeout
+        self.max_message = max_message
+        self.executor = None
+        self.slots = None
+        self.queues = {}
+        self.batchers = []
+        self.running = set()  # _run tasks of the batches in flight
+        self.latencies = {op: deque(maxlen=LATENCY_WINDOW) for op in OPERATIONS}
+        self.counters = {op: {'requests': 0, 'errors': 0, 'timeouts': 0, 'batches': 0, 'batched': 0}
+                         for op in OPERATIONS}
+
+    async def start(self):
+        self.executor = ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker,
+                                            initargs=(self.private_pem,))
+        # Batches running or waiting for a worker; while all are taken the
+        # queues fill up and clients are no longer read
+        self.slots = asyncio.Semaphore(2 * self.workers)
+        for op in OPERATIONS:
+            self.queues[op] = asyncio.Queue(maxsize=self.max_pending)
+            self.batchers.append(asyncio.create_task(self._batcher(op)))
+
+    async def close(self):
+        for task in self.batchers:
+            task.cancel()
+        await asyncio.gather(*self.batchers, return_exceptions=True)
+        # Let the batches in flight finish, within the request timeout
+        if self.running:
+            _, pending = await asyncio.wait(self.running, timeout=self.timeout)
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+        self.executor.shutdown(cancel_futures=True)
+
+    async def _batcher(self, op):
+        # Take the first waiting request, then whatever arrives within max_delay
+        loop = asyncio.get_running_loop()
+        queue = self.queues[op]
+        while True:
+            batch = [await queue.get()]
+            # Only hold a slot once there is work, so idle operations never block busy ones
+            await self.slots.acquire()
+            deadline = loop.time() + self.max_delay
+            while len(batch) < self.max_batch:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(queue.get(), remaining))
+                except asyncio.TimeoutError:
+                    break
+            # Requests that already timed out are not worth computing
+            batch = [(payload, future) for payload, future in batch if not future.done()]
+            if not batch:
+                self.slots.release()
+                continue
+            self.counters[op]['batches'] += 1
+            self.counters[op]['batched'] += len(batch)
+            # Several batches may run at once, up to the number of slots. The
+            # tasks are kept so that they are not garbage collected mid-run
+            task = asyncio.create_task(self._run(op, batch))
+            self.running.add(task)
+            task.add_done_callback(self.running.discard)
+
+    async def _run(self, op, batch):
+        loop = asyncio.get_running_loop()
+        try:
+            results = await loop.run_in_executor(self.executor, _run_batch, op,
+                                                 [payload for payload, _ in batch])
+        except Exception as e:
+            results = [(False, f"worker failure: {e}")] * len(batch)
+        finally:
+            self.slots.release()
+        for (_, future), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
+
+    async def submit(self, op, payload):
+        """
+        Queues one request and waits for its result.
+
+        :return: (ok, result bytes or error message).
+        """
+        counters = self.counters[op]
+        counters['requests'] += 1
+        start = time.perf_counter()
+        future = asyncio.get_running_loop().create_future()
+        try:
+            # Waiting here is the backpressure: the queue holds max_pending requests
+            await asyncio.wait_for(self.queues[op].put((payload, future)), self.timeout)
+            ok, result = await asyncio.wait_for(future, max(self.timeout - (time.perf_counter() - start), 0))
+        except asyncio.TimeoutError:
+            counters['timeouts'] += 1
+            return False, 'timeout'
+        if not ok:
+            counters['errors'] += 1
+        self.latencies[op].append(time.perf_counter() - start)
+        return ok, result
+
+    def metrics(self):
+        """
+        Request counters and latency percentiles (ms) over the last
+        LATENCY_WINDOW requests of every operation.
+        """
+        report = {}
+        for op in OPERATIONS:
+            counters = self.counters[op]
+            entry = dict(counters, queued=self.queues[op].qsize() if op in self.queues else 0)
+            entry['mean_batch'] = counters['batched'] / counters['batches'] if counters['batches'] else 0.0
+            samples = sorted(self.latencies[op])
+            if samples:
+                entry.update({f'p{int(q * 100)}_ms': _percentile(samples, q) * 1000 for q in (0.5, 0.95, 0.99)})
+                entry['max_ms'] = samples[-1] * 1000
+            report[op] = entry
+        return report
+
+    async def _answer(self, request, writer, lock):
+        op = request.get('op')
+        response = {'id': request.get('id')}
+        if op == 'metrics':
+            response.update(ok=True, metrics=self.metrics())
+        elif op not in OPERATIONS:
+            response.update(ok=False, error=f"unknown operation: {op!r}")
+        else:
+            try:
+                payload = base64.b64decode(request.get('data', ''), validate=True)
+            except ValueError:
+                response.update(ok=False, error="data is not valid base64")
+            else:
+                ok, result = await self.submit(op, payload)
+                if ok:
+                    response.update(ok=True, data=base64.b64encode(result).decode('ascii'))
+                else:
+                    response.update(ok=False, error=result)
+        async with lock:
+            writer.write(json.dumps(response).encode('utf-8') + b'\n')
+            await writer.drain()
+
+    async def handle_client(self, reader, writer):
+        # Responses are written as they complete and matched by id
+        lock = asyncio.Lock()
+        tasks = set()
+        try:
+            while True:
+                try:
+                    line = await reader.readline()
+                except ValueError:
+                    break  # Line longer than max_message
+                if not line:
+                    break
+                try:
+                    request = json.loads(line)
+                except ValueError:
+                    request = {'op': None}
+                if not isinstance(request, dict):
+                    request = {'op': None}
+                task = asyncio.create_task(self._answer(request, writer, lock))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+                # Backpressure: stop reading while this client has too many requests in flight
+                if len(tasks) >= self.max_pending:
+                    await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+            if tasks:
+                await asyncio.wait(tasks)
+        finally:
+            writer.close()
+
+    async def serve(self, socket_path=None, host='127.0.0.1', port=8765):
+        """
+        Serves clients on a Unix socket if socket_path is given, otherwise on
+        TCP host:port (localhost by default), until cancelled.
+        """
+        await self.start()
+        try:
+            if socket_path:
+                server = await asyncio.start_unix_server(self.handle_client, socket_path, limit=self.max_message)
+            else:
+                server = await asyncio.start_server(self.handle_client, host, port, limit=self.max_message)
+            async with server:
+                await server.serve_forever()
+        finally:
+            await self.close()
+
+
+class ServiceClient:
+    """Asyncio client multiplexing concurrent requests over one connection."""
+
+    def __init__(self, reader, writer):
+        self.reader = reader
+        self.writer = writer
+        self.waiting = {}
+        self.next_id = 0
+        self.receiver = asyncio.create_task(self._receive())
+
+    @classmethod
+    async def connect(cls, socket_path=None, host='127.0.0.1', port=8765, limit=64 << 20):
+        if socket_path:
+            reader, writer = await asyncio.open_unix_connection(socket_path, limit=limit)
+        else:
+            reader, writer = await asyncio.open_connection(host, port, limit=limit)
+        return cls(reader, writer)
+
+    async def _receive(self):
+        while True:
+            line = await self.reader.readline()
+            if not line:
+                break
+            response = json.loads(line)
+            future = self.waiting.pop(response.get('id'), None)
+            if future is not None and not future.done():
+                future.set_result(response)
+        for future in self.waiting.values():
+            future.set_exception(ConnectionError("service closed the connection"))
+
+    async def request(self, op, data=b''):
+        """
+        Sends one request.
+
+        :return: Result bytes (or the metrics dict for op='metrics').
+        :raises ValueError: If the service reports an error.
+        """
+        self.next_id += 1
+        request_id = self.next_id
+        future = asyncio.get_running_loop().create_future()
+        self.waiting[request_id] = future
+        request = {'id': request_id, 'op': op, 'data': base64.b64encode(data).decode('ascii')}
+        self.writer.write(json.dumps(request).encode('utf-8') + b'\n')
+        await self.writer.drain()
+        response = await future
+        if not response['ok']:
+            raise ValueError(response['error'])
+        if op == 'metrics':
+            return response['metrics']
+        return base64.b64decode(response['data'])
+
+    async def close(self):
+        self.writer.close()
+        self.receiver.cancel()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Local RSA encryption service with request batching.")
+    parser.add_argument('--key', default='service_key.pem', help="private key file, created if missing")
+    parser.add_argument('--passphrase-env', help="environment variable holding the key passphrase")
+    parser.add_argument('--key-size', type=int, default=2048, help="size of a newly created key")
+    parser.add_argument('--socket', help="Unix socket path (default: TCP on --host/--port)")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--workers', type=int, default=None, help="number of worker processes")
+    parser.add_argument('--max-batch', type=int, default=64, help="largest micro-batch")
+    parser.add_argument('--max-delay', type=float, default=0.002, help="seconds to wait for a batch to fill")
+    parser.add_argument('--max-pending', type=int, default=1024, help="queued requests per operation")
+    parser.add_argument('--timeout', type=float, default=5.0, help="per-request timeout in seconds")
+    args = parser.parse_args()
+
+    passphrase = os.environ[args.passphrase_env] if args.passphrase_env else None
+    _, private_key = load_or_create_keys(args.key, args.key_size, passphrase)
+    service = EncryptionService(private_key, args.workers, args.max_batch, args.max_delay,
+                                args.max_pending, args.timeout)
+    try:
+        asyncio.run(service.serve(args.socket, args.host, args.port))
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,180 @@
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+from functools import wraps
+
+# Recording is off unless enabled here or with SOLUTION_INSTRUMENTATION=1.
+# When off, every entry point returns after a single global check.
+ENABLED = os.environ.get('SOLUTION_INSTRUMENTATION') == '1'
+
+# Upper bounds (seconds) of the latency histogram buckets, plus +Inf
+DEFAULT_BUCKETS = (1e-6, 1e-5, 1e-4, 5e-4, 1e-3, 5e-3, 1e-2, 5e-2, 0.1, 0.5, 1.0, 5.0, 10.0)
+
+_lock = threading.Lock()
+_counters = {}    # (name, labels) -> value
+_histograms = {}  # (name, labels) -> [bucket counts, sum, count]
+
+
+def enable():
+    global ENABLED
+    ENABLED = True
+
+
+def disable():
+    global ENABLED
+    ENABLED = False
+
+
+def reset():
+    """Drop every recorded counter and histogram."""
+    with _lock:
+        _counters.clear()
+        _histograms.clear()
+
+
+def count(name, value=1, **labels):
+    """Add value to a counter, e.g. count('task1_truthtable_rows', 1024)."""
+    if not ENABLED:
+        return
+    key = (name, tuple(sorted(labels.items())))
+    with _lock:
+        _counters[key] = _counters.get(key, 0) + value
+
+
+def observe(name, value, **labels):
+    """Record one sample (usually seconds) in a histogram."""
+    if not ENABLED:
+        return
+    key = (name, tuple(sorted(labels.items())))
+    with _lock:
+        histogram = _histograms.get(key)
+        if histogram is None:
+            histogram = _histograms[key] = [[0] * (len(DEFAULT_BUCKETS) + 1), 0.0, 0]
+        histogram[0][bisect_left(DEFAULT_BUCKETS, value)] += 1
+        histogram[1] += value
+        histogram[2] += 1
+
+
+class _Timer:
+    def __init__(self, name, labels):
+        self.name = name
+        self.labels = labels
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        observe(self.name, time.perf_counter() - self.start, **self.labels)
+
+
+class _NullTimer:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        pass
+
+
+_NULL_TIMER = _NullTimer()
+
+
+def timer(name, **labels):
+    """
+    Context manager recording the duration of its block in a histogram:
+        with timer('task1_parse_seconds'):
+            ...
+    """
+    if not ENABLED:
+        return _NULL_TIMER
+    return _Timer(name, labels)
+
+
+def timed(name=None, **labels):
+    """
+    Decorator recording the duration of every call in a histogram, named
+    after the function unless name is given.
+    """
+    def decorate(func):
+        metric = name or f"{func.__module__}_{func.__name__}_seconds".lower()
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            if not ENABLED:
+                return func(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                observe(metric, time.perf_counter() - start, **labels)
+        return wrapper
+    return decorate
+
+
+def snapshot():
+    """
+    Copy of the recorded metrics, ready to dump as JSON.
+    Output: dict with 'counters' and 'histograms' lists; histogram buckets are
+    cumulative, as in Prometheus, with the mean of the samples added.
+    """
+    with _lock:
+        counters = [{'name': name, 'labels': dict(labels), 'value': value}
+                    for (name, labels), value in sorted(_counters.items())]
+        histograms = []
+        for (name, labels), (buckets, total, samples) in sorted(_histograms.items()):
+            cumulative = []
+            running = 0
+            for bound, bucket in zip(DEFAULT_BUCKETS + (float('inf'),), buckets):
+                running += bucket
+                cumulative.append(['+Inf' if bound == float('inf') else bound, running])
+            histograms.append({'name': name, 'labels': dict(labels), 'count': samples, 'sum': total,
+                               'mean': total / samples if samples else 0.0, 'buckets': cumulative})
+    return {'counters': counters, 'histograms': histograms}
+
+
+def _label_text(labels, extra=None):
+    items = list(labels.items()) + ([extra] if extra else [])
+    if not items:
+        return ''
+    escaped = (str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') for _, value in items)
+    return '{' + ','.join(f'{key}="{value}"' for (key, _), value in zip(items, escaped)) + '}'
+
+
+def prometheus_text():
+    """Recorded metrics in the Prometheus text exposition format."""
+    data = snapshot()
+    lines = []
+    typed = set()
+    for counter in data['counters']:
+        name = counter['name'] + '_total'
+        if name not in typed:
+            typed.add(name)
+            lines.append(f"# TYPE {name} counter")
+        lines.append(f"{name}{_label_text(counter['labels'])} {counter['value']}")
+    for histogram in data['histograms']:
+        name = histogram['name']
+        if name not in typed:
+            typed.add(name)
+            lines.append(f"# TYPE {name} histogram")
+        for bound, running in histogram['buckets']:
+            lines.append(f"{name}_bucket{_label_text(histogram['labels'], ('le', bound))} {running}")
+        lines.append(f"{name}_sum{_label_text(histogram['labels'])} {histogram['sum']}")
+        lines.append(f"{name}_count{_label_text(histogram['labels'])} {histogram['count']}")
+    return '\n'.join(lines) + '\n'
+
+
+def dump(file_path, fmt=None):
+    """
+    Write the recorded metrics to a file, as JSON or Prometheus text
+    ('json' or 'prometheus'; by default .json files get JSON).
+    """
+    fmt = fmt or ('json' if file_path.endswith('.json') else 'prometheus')
+    with open(file_path, 'w') as file:
+        if fmt == 'json':
+            json.dump(snapshot(), file, indent=2)
+        elif fmt == 'prometheus':
+            file.write(prometheus_text())
+        else:
+            raise ValueError(f"Unknown metrics format: {fmt!r}")
@@ -0,0 +1,151 @@
+import hashlib
+import os
+from collections import OrderedDict, deque
+from concurrent.futures import ProcessPoolExecutor
+
+from Crypto.PublicKey import RSA
+
+# Parsed keys by (path, modification time, size, passphrase digest), for the
+# KEY_CACHE_SIZE most recently used ones
+KEY_CACHE_SIZE = 32
+_KEY_CACHE = OrderedDict()
+
+
+def _passphrase_digest(passphrase):
+    # The cache is keyed by a digest so it never holds the passphrase itself
+    if passphrase is None:
+        return None
+    if isinstance(passphrase, str):
+        passphrase = passphrase.encode('utf-8')
+    return hashlib.sha256(passphrase).digest()
+
+
+def load_key(path, passphrase=None):
+    """
+    Loads an RSA key from a PEM or DER file. Parsed keys are cached until the
+    file changes, so repeated loads skip parsing and decryption.
+
+    :param path: Key file path.
+    :param passphrase: Passphrase of an encrypted private key.
+    :return: RSA key object.
+    :raises ValueError: If the file is not a key or the passphrase is wrong.
+    """
+    path = os.path.abspath(path)
+    stat = os.stat(path)
+    cache_key = (path, stat.st_mtime_ns, stat.st_size, _passphrase_digest(passphrase))
+    key = _KEY_CACHE.get(cache_key)
+    if key is None:
+        with open(path, 'rb') as file:
+            key = RSA.import_key(file.read(), passphrase)
+        # Keys parsed from earlier versions of the file will never be hit again
+        for stale in [entry for entry in _KEY_CACHE if entry[0] == path and entry[1:3] != cache_key[1:3]]:
+            del _KEY_CACHE[stale]
+        _KEY_CACHE[cache_key] = key
+        if len(_KEY_CACHE) > KEY_CACHE_SIZE:
+            _KEY_CACHE.popitem(last=False)
+    else:
+        _KEY_CACHE.move_to_end(cache_key)
+    return key
+
+
+def save_key(key, path, passphrase=None, key_format='PEM'):
+    """
+    Saves an RSA key as PEM or DER. Private keys are written readable by the
+    owner only, PKCS#8-encrypted when a passphrase is given.
+
+    :param key: RSA key object.
+    :param path: Key file path.
+    :param passphrase: Passphrase protecting a private key.
+    :param key_format: 'PEM' or 'DER'.
+    """
+    if key.has_private() and passphrase is not None:
+        data = key.export_key(key_format, passphrase=passphrase, pkcs=8,
+                              protection='scryptAndAES128-CBC')
+    else:
+        data = key.export_key(key_format)
+    # Write to a temporary file and rename, so readers never see a partial key.
+    # The mode only applies to a new file, so a leftover one is removed first
+    # and O_EXCL makes sure the key goes to a file created here
+    tmp_path = path + '.tmp'
+    mode = 0o600 if key.has_private() else 0o644
+    try:
+        os.unlink(tmp_path)
+    except FileNotFoundError:
+        pass
+    descriptor = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, mode)
+    with os.fdopen(descriptor, 'wb') as file:
+        file.write(data)
+    os.replace(tmp_path, path)
+
+
+def load_or_create_keys(path, key_size=2048, passphrase=None, pool=None):
+    """
+    Loads the private key stored at path, or creates and saves one if the
+    file does not exist yet.
+
+    :param path: Private key file path.
+    :param key_size: Length of a new key in bits.
+    :param passphrase: Passphrase of the private key file.
+    :param pool: KeyPool to take a new key from instead of generating it.
+    :return: (public_key, private_key), like Task3.generate_keys.
+    """
+    if os.path.exists(path):
+        private_key = load_key(path, passphrase)
+    else:
+        private_key = pool.get()[1] if pool is not None else RSA.generate(key_size)
+        save_key(private_key, path, passphrase)
+    return private_key.publickey(), private_key
+
+
+def _generate_der(key_size):
+    # Keys cross the process boundary as DER bytes
+    return RSA.generate(key_size).export_key('DER')
+
+
+class KeyPool:
+    """
+    Pre-generates RSA key pairs in background processes. A queue of size
+    pairs is kept in flight, so get() returns immediately once the pool has
+    warmed up, and each pair taken is replaced in the background.
+    """
+
+    def __init__(self, key_size=2048, size=4, workers=None):
+        """
+        :param key_size: Length of the keys in bits.
+        :param size: Number of pairs generated ahead.
+        :param workers: Number of worker processes (default: CPU count).
+        """
+        self.key_size = key_size
+        self.executor = ProcessPoolExecutor(max_workers=workers or os.cpu_count() or 1)
+        self.pending = deque(self.executor.submit(_generate_der, key_size) for _ in range(size))
+
+    def get(self, timeout=None):
+        """
+        Takes a fresh key pair, preferring one that is already generated.
+
+        :param timeout: Seconds to wait when no pair is ready (default: no limit).
+        :return: (public_key, private_key).
+        :raises TimeoutError: If no pair is ready within timeout.
+        """
+        ready = next((future for future in self.pending if future.done()), None)
+        future = ready or self.pending[0]
+        der = future.result(timeout)
+        self.pending.remove(future)
+        self.pending.append(self.executor.submit(_generate_der, self.key_size))
+        private_key = RSA.import_key(der)
+        return private_key.publickey(), private_key
+
+    def ready(self):
+        """Number of pairs that can be taken without waiting."""
+        return sum(future.done() for future in self.pending)
+
+    def close(self):
+        for future in self.pending:
+            future.cancel()
+        self.executor.shutdown()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
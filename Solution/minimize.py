@@ -0,0 +1,284 @@
+from Task1 import Postfix2Bitmask, _variable_column
+
+# Above this many variables 'auto' switches from Quine-McCluskey to the heuristic
+MAX_EXACT_VARS = 10
+# Branch-and-bound nodes explored before the exact cover settles for the best so far
+MAX_COVER_NODES = 20000
+
+# A cube is a pair (bits, dashes) over the bits of a truth-table row number:
+# row bit j belongs to variable num_vars - 1 - j and is 0 when that variable is
+# True (the row order of Postfix2Truthtable). Dashed bits are don't-cares and
+# are always 0 in bits, so a minterm is simply (row, 0).
+
+
+def _literal_columns(num_vars):
+    # columns[j][b] = rows whose bit j equals b
+    mask = (1 << (1 << num_vars)) - 1
+    columns = []
+    for j in range(num_vars):
+        true_rows = _variable_column(num_vars - 1 - j, num_vars)
+        columns.append((true_rows, mask ^ true_rows))
+    return columns
+
+
+def _cube_column(cube, literals, mask):
+    # Packed set of rows covered by a cube
+    bits, dashes = cube
+    column = mask
+    for j, pair in enumerate(literals):
+        if not (dashes >> j) & 1:
+            column &= pair[(bits >> j) & 1]
+    return column
+
+
+def _cover_cost(cover):
+    # Fewer cubes first, then fewer literals (more don't-cares)
+    return len(cover), -sum(dashes.bit_count() for _, dashes in cover)
+
+
+def _cube_to_infix(cube, variables):
+    bits, dashes = cube
+    num_vars = len(variables)
+    literals = []
+    for i, var in enumerate(variables):
+        j = num_vars - 1 - i
+        if not (dashes >> j) & 1:
+            literals.append(var if not (bits >> j) & 1 else '~' + var)
+    return '&'.join(literals) if literals else '1'
+
+
+def _cover_to_infix(cover, variables):
+    if not cover:
+        return '0'
+    # Sorted so that the same function always prints the same way
+    terms = sorted(_cube_to_infix(cube, variables) for cube in cover)
+    return '|'.join(terms)
+
+
+def prime_implicants(minterms):
+    """
+    Quine-McCluskey: merge cubes that differ in exactly one bit until no more
+    merges are possible. Cubes are grouped by their dashes and number of 1 bits
+    so only neighbouring groups are compared.
+    """
+    terms = {(m, 0) for m in minterms}
+    primes = set()
+    while terms:
+        groups = {}
+        for bits, dashes in terms:
+            groups.setdefault((dashes, bits.bit_count()), []).append(bits)
+        merged = set()
+        used = set()
+        for (dashes, ones), group in groups.items():
+            neighbours = groups.get((dashes, ones + 1))
+            if not neighbours:
+                continue
+            for a in group:
+                for b in neighbours:
+                    diff = a ^ b
+                    # Exactly one differing bit, and b has it set
+                    if diff & (diff - 1) == 0 and b & diff:
+                        merged.add((a, dashes | diff))
+                        used.add((a, dashes))
+                        used.add((b, dashes))
+        primes |= terms - used
+        terms = merged
+    return primes
+
+
+def _exact_cover(on, cubes, columns):
+    """
+    Smallest set of cubes covering every row of on: essential cubes first,
+    then branch and bound on the lowest uncovered row.
+    """
+    once = twice = 0
+    for column in columns:
+        twice |= once & column
+        once |= column
+    only_once = once & ~twice
+    chosen = [k for k, column in enumerate(columns) if column & only_once & on]
+    covered = 0
+    for k in chosen:
+        covered |= columns[k]
+
+    best = [None]
+    nodes = [0]
+
+    def cost(selection):
+        return _cover_cost([cubes[k] for k in selection])
+
+    def search(selection, covered):
+        nodes[0] += 1
+        remaining = on & ~covered
+        if not remaining:
+            if best[0] is None or cost(selection) < cost(best[0]):
+                best[0] = list(selection)
+            return
+        if best[0] is not None and (len(selection) + 1 > len(best[0]) or nodes[0] > MAX_COVER_NODES):
+            return
+        row = (remaining & -remaining).bit_length() - 1
+        candidates = [k for k, column in enumerate(columns) if (column >> row) & 1]
+        # Try cubes that cover the most uncovered rows first
+        candidates.sort(key=lambda k: -(columns[k] & remaining).bit_count())
+        for k in candidates:
+            selection.append(k)
+            search(selection, covered | columns[k])
+            selection.pop()
+
+    search(chosen, covered)
+    return [cubes[k] for k in best[0]]
+
+
+def _expand(cube, off, literals, mask, order):
+    # Raise literals to don't-cares while the cube stays clear of the OFF-set.
+    # Raising literal k leaves the kept literals before it and the literals
+    # after it, so both sides are ANDed up one column at a time instead of
+    # rebuilding the cube column for every try
+    bits, dashes = cube
+    fixed = [j for j in order if not (dashes >> j) & 1]
+    after = [off] * (len(fixed) + 1)  # after[k] = OFF rows matching fixed[k:]
+    for k in range(len(fixed) - 1, -1, -1):
+        j = fixed[k]
+        after[k] = after[k + 1] & literals[j][(bits >> j) & 1]
+    kept = mask  # rows matching the literals kept so far
+    for k, j in enumerate(fixed):
+        if kept & after[k + 1]:
+            kept &= literals[j][(bits >> j) & 1]
+        else:
+            bits &= ~(1 << j)
+            dashes |= 1 << j
+    return bits, dashes
+
+
+def _suffix_unions(columns):
+    # suffix[k] = union of columns[k:]
+    suffix = [0] * (len(columns) + 1)
+    for k in range(len(columns) - 1, -1, -1):
+        suffix[k] = suffix[k + 1] | columns[k]
+    return suffix
+
+
+def _irredundant(cover, literals, mask):
+    # Drop cubes whose rows are all covered by the other cubes. Smallest cubes
+    # are tried first so that the largest ones are the ones that survive.
+    cover = sorted(cover, key=lambda cube: cube[1].bit_count())
+    columns = [_cube_column(cube, literals, mask) for cube in cover]
+    suffix = _suffix_unions(columns)
+    kept = []
+    before = 0  # union of the cubes kept so far
+    for k, cube in enumerate(cover):
+        if columns[k] & ~(before | suffix[k + 1]):
+            kept.append(cube)
+            before |= columns[k]
+    return kept
+
+
+def _supercube(column, literals, mask):
+    # Smallest cube containing every row of column
+    if column.bit_count() <= len(literals):
+        # Few rows: the bits they agree on, straight from the row numbers
+        common = (1 << len(literals)) - 1
+        either = 0
+        while column:
+            low = column & -column
+            row = low.bit_length() - 1
+            common &= row
+            either |= row
+            column ^= low
+        return common, common ^ either
+    bits = dashes = 0
+    for j, (zero_rows, one_rows) in enumerate(literals):
+        if column & zero_rows == column:
+            continue
+        if column & one_rows == column:
+            bits |= 1 << j
+        else:
+            dashes |= 1 << j
+    return bits, dashes
+
+
+def espresso(on, num_vars):
+    """
+    Espresso-style heuristic minimization of the rows set in on.
+    EXPAND grows each uncovered minterm into a prime against the OFF-set,
+    IRREDUNDANT removes cubes covered by the rest, and REDUCE/EXPAND passes
+    with the opposite literal order are repeated while the cover improves.
+    Every step works on 2^num_vars-bit row sets, and the work grows with the
+    number of cubes: a few dozen terms over 16-20 variables take milliseconds,
+    but a dense random 16-variable function (some 9000 cubes) takes seconds.
+    """
+    mask = (1 << (1 << num_vars)) - 1
+    off = mask & ~on
+    literals = _literal_columns(num_vars)
+    forward = list(range(num_vars))
+
+    cover = []
+    covered = 0
+    while on & ~covered:
+        remaining = on & ~covered
+        row = (remaining & -remaining).bit_length() - 1
+        cube = _expand((row, 0), off, literals, mask, forward)
+        cover.append(cube)
+        covered |= _cube_column(cube, literals, mask)
+    cover = _irredundant(cover, literals, mask)
+
+    order = forward[::-1]
+    while True:
+        columns = [_cube_column(cube, literals, mask) for cube in cover]
+        suffix = _suffix_unions(columns)
+        reduced = []
+        before = 0  # union of the cubes already reduced
+        for k in range(len(cover)):
+            # REDUCE, one cube at a time against the cubes already reduced:
+            # shrink it to the smallest cube over the rows nobody else covers
+            unique = columns[k] & ~(before | suffix[k + 1]) & on
+            if unique:
+                reduced_cube = _supercube(unique, literals, mask)
+                reduced.append(reduced_cube)
+                before |= _cube_column(reduced_cube, literals, mask)
+        # Cubes REDUCE left alone are already prime, so EXPAND would keep them
+        primes = set(cover)
+        candidate = [cube if cube in primes else _expand(cube, off, literals, mask, order) for cube in reduced]
+        candidate = _irredundant(list(dict.fromkeys(candidate)), literals, mask)
+        if _cover_cost(candidate) >= _cover_cost(cover):
+            return cover
+        cover = candidate
+        order = order[::-1]
+
+
+def minimize_column(variables, column, method='auto'):
+    """
+    Minimal sum-of-products infix string for a packed truth-table column such
+    as the one returned by Postfix2Bitmask.
+    method is 'exact' (Quine-McCluskey), 'heuristic' (Espresso-style) or 'auto'.
+    """
+    num_vars = len(variables)
+    mask = (1 << (1 << num_vars)) - 1
+    if column == 0:
+        return '0'
+    if column == mask:
+        return '1'
+    if method == 'auto':
+        method = 'exact' if num_vars <= MAX_EXACT_VARS else 'heuristic'
+
+    if method == 'exact':
+        minterms = [row for row in range(1 << num_vars) if (column >> row) & 1]
+        cubes = sorted(prime_implicants(minterms))
+        literals = _literal_columns(num_vars)
+        columns = [_cube_column(cube, literals, mask) for cube in cubes]
+        cover = _exact_cover(column, cubes, columns)
+    elif method == 'heuristic':
+        cover = espresso(column, num_vars)
+    else:
+        raise ValueError(f"Unknown minimization method: {method!r}")
+    return _cover_to_infix(cover, variables)
+
+
+def minimize(postfix, method='auto'):
+    """
+    Minimize a postfix expression as returned by Infix2Postfix.
+    Output: an equivalent sum-of-products infix expression over the same
+    variables, e.g. 'P&Q|R'.
+    """
+    variables, column = Postfix2Bitmask(postfix)
+    return minimize_column(variables, column, method)
@@ -0,0 +1,337 @@
+import numpy as np
+
+# Largest number of cells a broadcast is allowed to materialize at once
+MAX_BROADCAST_CELLS = 1 << 24
+
+# Comparison operators and the operator of their negation
+_NEGATED_OP = {'<': '>=', '>=': '<', '>': '<=', '<=': '>', '==': '!=', '!=': '=='}
+_COMPARE = {
+    '<': np.less, '<=': np.less_equal, '>': np.greater,
+    '>=': np.greater_equal, '==': np.equal, '!=': np.not_equal,
+}
+
+
+class Var:
+    """
+    A variable ranging over the rows of a relation (a DataFrame).
+    x['Math'] refers to the Math column of the row bound to x.
+    """
+
+    def __init__(self, name, relation):
+        self.name = name
+        self.relation = relation
+
+    def __getitem__(self, column):
+        return Col(self, column)
+
+    def __repr__(self):
+        return self.name
+
+
+class Col:
+    """A column of the row bound to a variable; comparing it builds a formula."""
+
+    def __init__(self, var, column):
+        self.var = var
+        self.column = column
+
+    def _compare(self, op, other):
+        return Compare(op, self, other)
+
+    def __lt__(self, other):
+        return self._compare('<', other)
+
+    def __le__(self, other):
+        return self._compare('<=', other)
+
+    def __gt__(self, other):
+        return self._compare('>', other)
+
+    def __ge__(self, other):
+        return self._compare('>=', other)
+
+    def __eq__(self, other):
+        return self._compare('==', other)
+
+    def __ne__(self, other):
+        return self._compare('!=', other)
+
+    __hash__ = object.__hash__
+
+    def __repr__(self):
+        return f"{self.var.name}.{self.column}"
+
+
+class Formula:
+    """Base class of formulas; & | ~ build conjunctions, disjunctions and negations."""
+
+    def __and__(self, other):
+        return And(self, other)
+
+    def __or__(self, other):
+        return Or(self, other)
+
+    def __invert__(self):
+        return negate(self)
+
+    def implies(self, other):
+        return Or(negate(self), other)
+
+    def variables(self):
+        """Variables occurring free or bound in the formula."""
+        raise NotImplementedError
+
+
+class Compare(Formula):
+    def __init__(self, op, left, right):
+        self.op = op
+        self.left = left
+        self.right = right
+
+    def variables(self):
+        return {term.var for term in (self.left, self.right) if isinstance(term, Col)}
+
+    def __repr__(self):
+        return f"{self.left!r} {self.op} {self.right!r}"
+
+
+class Holds(Formula):
+    """A Task2 Predicate applied to the row bound to a variable, e.g. is_passing(x)."""
+
+    def __init__(self, predicate, var):
+        self.predicate = predicate
+        self.var = var
+
+    def variables(self):
+        return {self.var}
+
+    def __repr__(self):
+        return f"{self.predicate.name}({self.var.name})"
+
+
+class And(Formula):
+    def __init__(self, left, right):
+        self.left = left
+        self.right = right
+
+    def variables(self):
+        return self.left.variables() | self.right.variables()
+
+    def __repr__(self):
+        return f"({self.left!r} ∧ {self.right!r})"
+
+
+class Or(Formula):
+    def __init__(self, left, right):
+        self.left = left
+        self.right = right
+
+    def variables(self):
+        return self.left.variables() | self.right.variables()
+
+    def __repr__(self):
+        return f"({self.left!r} ∨ {self.right!r})"
+
+
+class ForAll(Formula):
+    def __init__(self, var, body):
+        self.var = var
+        self.body = body
+
+    def variables(self):
+        return {self.var} | self.body.variables()
+
+    def __repr__(self):
+        return f"∀{self.var.name} {self.body!r}"
+
+
+class Exists(Formula):
+    def __init__(self, var, body):
+        self.var = var
+        self.body = body
+
+    def variables(self):
+        return {self.var} | self.body.variables()
+
+    def __repr__(self):
+        return f"∃{self.var.name} {self.body!r}"
+
+
+def negate(formula):
+    """
+    Negation of a formula with the negation pushed down to the atoms:
+    ¬∀x P ≡ ∃x ¬P, ¬∃x P ≡ ∀x ¬P, De Morgan for ∧/∨ and flipped comparisons.
+    """
+    if isinstance(formula, ForAll):
+        return Exists(formula.var, negate(formula.body))
+    if isinstance(formula, Exists):
+        return ForAll(formula.var, negate(formula.body))
+    if isinstance(formula, And):
+        return Or(negate(formula.left), negate(formula.right))
+    if isinstance(formula, Or):
+        return And(negate(formula.left), negate(formula.right))
+    if isinstance(formula, Compare):
+        # Flipping the operator assumes scores are never missing (NaN)
+        return Compare(_NEGATED_OP[formula.op], formula.left, formula.right)
+    if isinstance(formula, Holds):
+        return Holds(~formula.predicate, formula.var)
+    raise TypeError(f"Cannot negate {formula!r}")
+
+
+def _conjuncts(formula):
+    if isinstance(formula, And):
+        return _conjuncts(formula.left) + _conjuncts(formula.right)
+    return [formula]
+
+
+class _Scope:
+    """Binding of variables to numpy axes (and row slices) during evaluation."""
+
+    def __init__(self, relations, axes, joins=None):
+        self.relations = relations
+        self.axes = axes    # var -> axis index
+        self.frames = {}    # var -> DataFrame bound to the variable
+        # quantifier -> (outer column, join keys), shared by all row chunks
+        self.joins = {} if joins is None else joins
+
+    def frame(self, var):
+        if var not in self.frames:
+            self.frames[var] = self.relations[var.relation]
+        return self.frames[var]
+
+    def along(self, var, values):
+        # Reshape a column so it only varies along the axis of var
+        shape = [1] * len(self.axes)
+        shape[self.axes[var]] = len(values)
+        return np.asarray(values).reshape(shape)
+
+    def term(self, term):
+        if isinstance(term, Col):
+            return self.along(term.var, self.frame(term.var)[term.column].to_numpy())
+        return term
+
+
+def _semijoin_keys(var, body, scope):
+    """
+    Plan ∃var body as a hash semi-join when body is an equality between a
+    column of var and a column of an outer variable, and every other conjunct
+    only mentions var: x.a ∈ {y.b | rest(y)}.
+    Output: (outer column, sorted unique keys), or None if not applicable.
+    """
+    parts = _conjuncts(body)
+    for k, part in enumerate(parts):
+        if not (isinstance(part, Compare) and part.op == '=='):
+            continue
+        left, right = part.left, part.right
+        if not (isinstance(left, Col) and isinstance(right, Col)):
+            continue
+        if right.var is not var:
+            left, right = right, left
+        if right.var is not var or left.var is var:
+            continue
+        rest = parts[:k] + parts[k + 1:]
+        if any(p.variables() - {var} for p in rest):
+            continue
+
+        inner = _Scope(scope.relations, {var: 0})
+        keys = inner.frame(var)[right.column].to_numpy()
+        if rest:
+            mask = np.ones(len(keys), dtype=bool)
+            for p in rest:
+                mask &= np.broadcast_to(_evaluate(p, inner), mask.shape)
+            keys = keys[mask]
+        return left, np.unique(keys)
+    return None
+
+
+def _plan_semijoin(formula, var, body, scope):
+    # The keys do not depend on the outer rows, so plan once per quantifier
+    if formula not in scope.joins:
+        scope.joins[formula] = _semijoin_keys(var, body, scope)
+    return scope.joins[formula]
+
+
+def _semijoin(formula, var, body, scope):
+    plan = _plan_semijoin(formula, var, body, scope)
+    if plan is None:
+        return None
+    outer, keys = plan
+    values = scope.frame(outer.var)[outer.column].to_numpy()
+    return scope.along(outer.var, np.isin(values, keys))
+
+
+def _evaluate(formula, scope):
+    # Boolean array over the axes of the scope (size 1 along unused axes)
+    if isinstance(formula, Compare):
+        return _COMPARE[formula.op](scope.term(formula.left), scope.term(formula.right))
+    if isinstance(formula, Holds):
+        mask = formula.predicate.mask(scope.frame(formula.var))
+        return scope.along(formula.var, np.asarray(mask, dtype=bool))
+    if isinstance(formula, And):
+        return np.logical_and(_evaluate(formula.left, scope), _evaluate(formula.right, scope))
+    if isinstance(formula, Or):
+        return np.logical_or(_evaluate(formula.left, scope), _evaluate(formula.right, scope))
+    if isinstance(formula, (Exists, ForAll)) and len(scope.frame(formula.var)) == 0:
+        # Vacuous over an empty relation. Reducing the body would not give this
+        # when it does not mention the variable, as its axis then has size 1
+        return np.full([1] * len(scope.axes), isinstance(formula, ForAll))
+    if isinstance(formula, Exists):
+        joined = _semijoin(formula, formula.var, formula.body, scope)
+        if joined is not None:
+            return joined
+        body = _evaluate(formula.body, scope)
+        return np.any(body, axis=scope.axes[formula.var], keepdims=True)
+    if isinstance(formula, ForAll):
+        # ∀x P ≡ ¬∃x ¬P, which lets equality joins use the semi-join too
+        joined = _semijoin(formula, formula.var, negate(formula.body), scope)
+        if joined is not None:
+            return np.logical_not(joined)
+        body = _evaluate(formula.body, scope)
+        return np.all(body, axis=scope.axes[formula.var], keepdims=True)
+    raise TypeError(f"Cannot evaluate {formula!r}")
+
+
+def _broadcast_variables(formula, scope):
+    # Variables of nested quantifiers that are not answered by a semi-join
+    if isinstance(formula, (And, Or)):
+        return _broadcast_variables(formula.left, scope) | _broadcast_variables(formula.right, scope)
+    if isinstance(formula, (ForAll, Exists)):
+        body = formula.body if isinstance(formula, Exists) else negate(formula.body)
+        if _plan_semijoin(formula, formula.var, body, scope) is not None:
+            return set()
+        return {formula.var} | _broadcast_variables(formula.body, scope)
+    return set()
+
+
+def evaluate(formula, relations):
+    """
+    Decide a closed formula over named relations, e.g. {'students': data}.
+    Nested quantifiers are evaluated with numpy broadcasts (or hash semi-joins
+    for equality conditions) instead of Python loops. The outermost quantifier
+    is processed in row chunks so that a broadcast never exceeds
+    MAX_BROADCAST_CELLS cells, and it stops at the first chunk that decides it.
+    """
+    variables = sorted(formula.variables(), key=lambda var: var.name)
+    axes = {var: i for i, var in enumerate(variables)}
+    if not isinstance(formula, (ForAll, Exists)):
+        return bool(np.all(_evaluate(formula, _Scope(relations, axes))))
+
+    outer = formula.var
+    frame = relations[outer.relation]
+    # Plan the semi-joins up front; only the other variables are broadcast
+    joins = {}
+    others = 1
+    for var in _broadcast_variables(formula.body, _Scope(relations, axes, joins)):
+        others *= max(len(relations[var.relation]), 1)
+    chunk = max(1, MAX_BROADCAST_CELLS // others)
+
+    want_any = isinstance(formula, Exists)
+    for start in range(0, len(frame), chunk):
+        scope = _Scope(relations, axes, joins)
+        scope.frames[outer] = frame.iloc[start:start + chunk]
+        if want_any:
+            if np.any(_evaluate(formula, scope)):
+                return True
+        elif not np.all(_evaluate(formula, scope)):
+            return False
+    return not want_any
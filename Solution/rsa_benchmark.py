@@ -0,0 +1,284 @@
+import argparse
+import csv
+import gc
+import json
+import os
+import sys
+import time
+
+import matplotlib
+matplotlib.use('Agg')  # Render to files; no display is needed
+import matplotlib.pyplot as plt
+
+from Task3 import generate_keys, hybrid_decrypt, hybrid_encrypt, rsa_decrypt, rsa_encrypt
+
+KEY_SIZES = (1024, 2048, 3072, 4096)
+MESSAGE_SIZES = (16, 64, 128)
+HYBRID_SIZES = (1 << 10, 1 << 20)
+STATISTICS = ('min', 'median', 'mean', 'p95', 'p99')
+FIELDS = ('operation', 'key_size', 'message_size', 'runs') + STATISTICS
+
+
+def max_message_size(key_size):
+    """
+    Largest message PKCS1_OAEP (SHA-1) can encrypt with a key.
+
+    :param key_size: Length of the RSA key in bits.
+    :return: Maximum plaintext length in bytes.
+    """
+    return key_size // 8 - 2 * 20 - 2
+
+
+def time_call(func, repeats, warmup=0):
+    """
+    Times repeated calls of func after warmup calls that are not recorded.
+    The garbage collector is paused so that it does not land in one sample.
+
+    :param func: Function called without arguments.
+    :param repeats: Number of recorded calls.
+    :param warmup: Number of calls made before recording.
+    :return: List of durations in seconds.
+    """
+    for _ in range(warmup):
+        func()
+    samples = []
+    gc.collect()
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        for _ in range(repeats):
+            start = time.perf_counter()
+            func()
+            samples.append(time.perf_counter() - start)
+    finally:
+        if enabled:
+            gc.enable()
+    return samples
+
+
+def _percentile(ordered, q):
+    # Linear interpolation between the closest ranks of sorted samples
+    position = (len(ordered) - 1) * q
+    low = int(position)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (position - low)
+
+
+def summarize(samples):
+    """
+    Summary statistics of timing samples.
+
+    :param samples: Durations in seconds.
+    :return: Dict with runs, min, median, mean, p95 and p99 (seconds).
+    """
+    ordered = sorted(samples)
+    return {
+        'runs': len(ordered),
+        'min': ordered[0],
+        'median': _percentile(ordered, 0.5),
+        'mean': sum(ordered) / len(ordered),
+        'p95': _percentile(ordered, 0.95),
+        'p99': _percentile(ordered, 0.99),
+    }
+
+
+def run_benchmark(key_sizes=KEY_SIZES, message_sizes=MESSAGE_SIZES, hybrid_sizes=HYBRID_SIZES,
+                  repeats=30, warmup=3, keygen_repeats=3):
+    """
+    Benchmarks key generation, RSA-OAEP encryption/decryption and the hybrid
+    RSA + AES-GCM scheme over key and message sizes. Message sizes above the
+    OAEP limit of a key are skipped for plain RSA.
+
+    :param key_sizes: RSA key lengths in bits.
+    :param message_sizes: Plaintext lengths for RSA-OAEP.
+    :param hybrid_sizes: Plaintext lengths for the hybrid scheme.
+    :param repeats: Recorded runs per encryption/decryption measurement.
+    :param warmup: Unrecorded runs before each encryption/decryption measurement.
+    :param keygen_repeats: Recorded key generations per key size.
+    :return: List of result dicts with the keys of FIELDS.
+    """
+    results = []
+
+    def record(operation, key_size, message_size, samples):
+        results.append({'operation': operation, 'key_size': key_size,
+                        'message_size': message_size, **summarize(samples)})
+
+    for key_size in key_sizes:
+        keys = []
+        samples = time_call(lambda: keys.append(generate_keys(key_size)), keygen_repeats)
+        record('keygen', key_size, 0, samples)
+        public_key, private_key = keys[-1]
+
+        for size in message_sizes:
+            if size > max_message_size(key_size):
+                continue
+            message = os.urandom(size)
+            ciphertext = rsa_encrypt(message, public_key)
+            record('encrypt', key_size, size,
+                   time_call(lambda: rsa_encrypt(message, public_key), repeats, warmup))
+            record('decrypt', key_size, size,
+                   time_call(lambda: rsa_decrypt(ciphertext, private_key), repeats, warmup))
+
+        for size in hybrid_sizes:
+            message = os.urandom(size)
+            ciphertext = hybrid_encrypt(message, public_key)
+            record('hybrid_encrypt', key_size, size,
+                   time_call(lambda: hybrid_encrypt(message, public_key), repeats, warmup))
+            record('hybrid_decrypt', key_size, size,
+                   time_call(lambda: hybrid_decrypt(ciphertext, private_key), repeats, warmup))
+    return results
+
+
+def save_results(results, path):
+    """
+    Saves results as JSON or CSV, depending on the file extension.
+
+    :param results: List of result dicts.
+    :param path: Output file ending in .json or .csv.
+    """
+    if path.endswith('.csv'):
+        with open(path, 'w', newline='') as file:
+            writer = csv.DictWriter(file, fieldnames=FIELDS)
+            writer.writeheader()
+            writer.writerows(results)
+    else:
+        with open(path, 'w') as file:
+            json.dump(results, file, indent=2)
+
+
+def load_results(path):
+    """
+    Loads results saved by save_results.
+
+    :param path: JSON or CSV file.
+    :return: List of result dicts.
+    """
+    if not path.endswith('.csv'):
+        with open(path) as file:
+            return json.load(file)
+    with open(path, newline='') as file:
+        results = []
+        for row in csv.DictReader(file):
+            for field in ('key_size', 'message_size', 'runs'):
+                row[field] = int(row[field])
+            for field in STATISTICS:
+                row[field] = float(row[field])
+            results.append(row)
+        return results
+
+
+def plot_results(results, output_dir, statistic='median'):
+    """
+    Renders one plot per operation to PNG files: time vs. message size for
+    each key size, and time vs. key size for key generation.
+
+    :param results: List of result dicts.
+    :param output_dir: Directory receiving the images.
+    :param statistic: Statistic plotted on the y axis.
+    :return: List of written file paths.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    paths = []
+    operations = dict.fromkeys(result['operation'] for result in results)
+    for operation in operations:
+        rows = [result for result in results if result['operation'] == operation]
+        plt.figure(figsize=(10, 6))
+        if operation == 'keygen':
+            plt.plot([row['key_size'] for row in rows], [row[statistic] for row in rows], marker='o')
+            plt.xlabel('Key size (bits)')
+        else:
+            for key_size in dict.fromkeys(row['key_size'] for row in rows):
+                series = [row for row in rows if row['key_size'] == key_size]
+                plt.plot([row['message_size'] for row in series], [row[statistic] for row in series],
+                         marker='o', label=f'{key_size}-bit key')
+            plt.xlabel('Plaintext Length (bytes)')
+            plt.xscale('log')
+            plt.legend()
+        plt.ylabel(f'Time (seconds, {statistic})')
+        plt.title(f'RSA {operation} time')
+        plt.grid(True)
+        plt.tight_layout()
+        path = os.path.join(output_dir, f'{operation}.png')
+        plt.savefig(path)
+        plt.close()
+        paths.append(path)
+    return paths
+
+
+def compare_results(results, baseline, threshold=0.10, statistic='median'):
+    """
+    Flags measurements slower than a baseline by more than threshold.
+
+    :param results: Current list of result dicts.
+    :param baseline: Baseline list of result dicts.
+    :param threshold: Allowed relative slowdown (0.10 = 10%).
+    :param statistic: Statistic compared.
+    :return: List of (result, baseline value, ratio) for the regressions.
+    """
+    reference = {(row['operation'], row['key_size'], row['message_size']): row[statistic] for row in baseline}
+    regressions = []
+    for result in results:
+        before = reference.get((result['operation'], result['key_size'], result['message_size']))
+        if not before:
+            continue
+        ratio = result[statistic] / before
+        if ratio > 1 + threshold:
+            regressions.append((result, before, ratio))
+    return regressions
+
+
+def print_results(results):
+    """
+    Prints an ASCII table of results, in milliseconds.
+
+    :param results: List of result dicts.
+    """
+    header = ['Operation', 'Key', 'Bytes', 'Runs'] + [f'{name} (ms)' for name in STATISTICS]
+    widths = [15, 6, 9, 5] + [12] * len(STATISTICS)
+    sep = " | "
+    print(sep.join(h.ljust(w) for h, w in zip(header, widths)))
+    print("-" * (sum(widths) + len(sep) * (len(widths) - 1)))
+    for result in results:
+        row = [result['operation'], str(result['key_size']), str(result['message_size']), str(result['runs'])]
+        row += [f"{result[name] * 1000:.3f}" for name in STATISTICS]
+        print(sep.join(r.ljust(w) for r, w in zip(row, widths)))
+
+
+def _sizes(text):
+    return [int(size) for size in text.split(',') if size]
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Benchmark RSA key generation, RSA-OAEP and hybrid encryption.")
+    parser.add_argument('--key-sizes', type=_sizes, default=list(KEY_SIZES), help="comma-separated key sizes in bits")
+    parser.add_argument('--message-sizes', type=_sizes, default=list(MESSAGE_SIZES),
+                        help="comma-separated RSA-OAEP message sizes in bytes")
+    parser.add_argument('--hybrid-sizes', type=_sizes, default=list(HYBRID_SIZES),
+                        help="comma-separated hybrid message sizes in bytes (empty to skip)")
+    parser.add_argument('--repeats', type=int, default=30, help="recorded runs per measurement")
+    parser.add_argument('--warmup', type=int, default=3, help="unrecorded runs before each measurement")
+    parser.add_argument('--keygen-repeats', type=int, default=3, help="recorded key generations per key size")
+    parser.add_argument('-o', '--output', action='append', default=[],
+                        help="save results to a .json or .csv file (repeatable)")
+    parser.add_argument('--plot-dir', help="render plots to PNG files in this directory")
+    parser.add_argument('--baseline', help="results file to compare against; exit with status 1 on regressions")
+    parser.add_argument('--threshold', type=float, default=0.10, help="allowed relative slowdown vs. the baseline")
+    parser.add_argument('--statistic', choices=STATISTICS, default='median', help="statistic used to compare and plot")
+    args = parser.parse_args()
+
+    results = run_benchmark(args.key_sizes, args.message_sizes, args.hybrid_sizes,
+                            args.repeats, args.warmup, args.keygen_repeats)
+    print_results(results)
+    for path in args.output:
+        save_results(results, path)
+    if args.plot_dir:
+        plot_results(results, args.plot_dir, args.statistic)
+
+    if args.baseline:
+        regressions = compare_results(results, load_results(args.baseline), args.threshold, args.statistic)
+        for result, before, ratio in regressions:
+            print(f"REGRESSION {result['operation']} key={result['key_size']} bytes={result['message_size']}: "
+                  f"{before * 1000:.3f} ms -> {result[args.statistic] * 1000:.3f} ms ({ratio:.2f}x)")
+        if regressions:
+            sys.exit(1)
+        print(f"No regression above {args.threshold:.0%} against {args.baseline}")
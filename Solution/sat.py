@@ -0,0 +1,365 @@
+import argparse
+import heapq
+import sys
+
+from Task1 import Infix2Postfix, build_dag
+
+
+def tseitin_cnf(postfix):
+    """
+    Convert a postfix expression to an equisatisfiable CNF (Tseitin transform).
+    Input: postfix string as returned by Infix2Postfix.
+    Output: (num_vars, clauses, variables). Clauses are lists of DIMACS
+    literals; the formula variable variables[i] is DIMACS variable i + 1 and
+    every shared subformula of the DAG gets exactly one auxiliary variable.
+    """
+    variables, nodes, root = build_dag(postfix)
+    num_vars = len(variables)
+    clauses = []
+    literals = []  # DIMACS literal standing for each DAG node
+
+    for op, left, right in nodes:
+        if op == 'var':
+            literals.append(left + 1)
+            continue
+        if op == '~':
+            # Negation needs no new variable, just the opposite literal
+            literals.append(-literals[left])
+            continue
+
+        num_vars += 1
+        t = num_vars
+        literals.append(t)
+        if op == 'const':
+            clauses.append([t] if left else [-t])
+            continue
+        a, b = literals[left], literals[right]
+        if op == '&':
+            clauses += [[-t, a], [-t, b], [t, -a, -b]]
+        elif op == '|':
+            clauses += [[t, -a], [t, -b], [-t, a, b]]
+        elif op == '>':
+            clauses += [[-t, -a, b], [t, a], [t, -b]]
+        else:
+            clauses += [[-t, -a, b], [-t, a, -b], [t, a, b], [t, -a, -b]]
+
+    # The whole formula must be true
+    clauses.append([literals[root]])
+    return num_vars, clauses, variables
+
+
+def _luby(i):
+    # i-th term (1-based) of the Luby restart sequence 1, 1, 2, 1, 1, 2, 4, ...
+    size, power = 1, 0
+    while size < i + 1:
+        power += 1
+        size = 2 * size + 1
+    while size - 1 != i:
+        size = (size - 1) // 2
+        power -= 1
+        i = i % size
+    return 1 << power
+
+
+def solve_cnf(num_vars, clauses, restart_base=100):
+    """
+    Decide a CNF formula with a CDCL solver (two watched literals, first-UIP
+    clause learning with minimization, VSIDS branching with phase saving, Luby
+    restarts and periodic reduction of the learned clause database).
+    Input: number of variables and a list of clauses of DIMACS literals.
+    Output: a list model where model[v] is the value of variable v (index 0
+    is unused), or None if the formula is unsatisfiable.
+    """
+    value = [0] * (num_vars + 1)     # 1 true, -1 false, 0 unassigned
+    level = [0] * (num_vars + 1)
+    reason = [None] * (num_vars + 1)
+    phase = [-1] * (num_vars + 1)
+    activity = [0.0] * (num_vars + 1)
+    watches = {}                     # literal -> clauses watching it
+    problem = []                     # input clauses with two or more literals
+    learnts = []                     # (glue, clause) of learned clauses
+    trail = []
+    trail_lim = []
+    bump = 1.0
+
+    def lit_value(lit):
+        v = value[abs(lit)]
+        return v if lit > 0 else -v
+
+    def assign(lit, clause):
+        var = abs(lit)
+        value[var] = 1 if lit > 0 else -1
+        level[var] = len(trail_lim)
+        reason[var] = clause
+        trail.append(lit)
+
+    def watch(clause):
+        watches.setdefault(clause[0], []).append(clause)
+        watches.setdefault(clause[1], []).append(clause)
+
+    # Simplify the input: drop duplicate literals and tautological clauses
+    units = []
+    for clause in clauses:
+        clause = list(dict.fromkeys(clause))
+        if any(-lit in clause for lit in clause):
+            continue
+        if not clause:
+            return None
+        if len(clause) == 1:
+            units.append(clause[0])
+        else:
+            problem.append(clause)
+            watch(clause)
+        for lit in clause:
+            activity[abs(lit)] += 1.0
+    for lit in units:
+        if lit_value(lit) < 0:
+            return None
+        if lit_value(lit) == 0:
+            assign(lit, None)
+
+    heap = [(-activity[var], var) for var in range(1, num_vars + 1)]
+    heapq.heapify(heap)
+    qhead = 0
+
+    def propagate():
+        # Unit propagation over the two watched literals; returns a conflict
+        nonlocal qhead
+        while qhead < len(trail):
+            false_lit = -trail[qhead]
+            qhead += 1
+            watching = watches.get(false_lit, [])
+            kept = []
+            for index, clause in enumerate(watching):
+                # Keep the falsified watch in position 1
+                if clause[0] == false_lit:
+                    clause[0], clause[1] = clause[1], clause[0]
+                if lit_value(clause[0]) > 0:
+                    kept.append(clause)
+                    continue
+                for k in range(2, len(clause)):
+                    if lit_value(clause[k]) >= 0:
+                        clause[1], clause[k] = clause[k], clause[1]
+                        watches.setdefault(clause[1], []).append(clause)
+                        break
+                else:
+                    kept.append(clause)
+                    if lit_value(clause[0]) < 0:
+                        kept.extend(watching[index + 1:])
+                        watches[false_lit] = kept
+                        return clause
+                    assign(clause[0], clause)
+            watches[false_lit] = kept
+        return None
+
+    def analyze(conflict):
+        # First-UIP learning: resolve until one literal of this level is left
+        nonlocal bump
+        current = len(trail_lim)
+        seen = set()
+        learned = [None]
+        pending = 0
+        lit = None
+        index = len(trail) - 1
+        clause = conflict
+        while True:
+            for q in clause:
+                if q == lit:
+                    continue
+                var = abs(q)
+                if var in seen or level[var] == 0:
+                    continue
+                seen.add(var)
+                activity[var] += bump
+                heapq.heappush(heap, (-activity[var], var))
+                if level[var] == current:
+                    pending += 1
+                else:
+                    learned.append(q)
+            while abs(trail[index]) not in seen:
+                index -= 1
+            lit = trail[index]
+            index -= 1
+            pending -= 1
+            if pending == 0:
+                break
+            clause = reason[abs(lit)]
+        learned[0] = -lit
+        bump *= 1.05
+        if bump > 1e100:
+            # Rescale activities before they overflow, keeping their order
+            for var in range(1, num_vars + 1):
+                activity[var] *= 1e-100
+            bump *= 1e-100
+            heap[:] = [(-activity[var], var) for var in range(1, num_vars + 1) if value[var] == 0]
+            heapq.heapify(heap)
+
+        # Drop literals implied by the rest of the clause through their reason
+        learned = [learned[0]] + [q for q in learned[1:] if not implied(q, seen)]
+        if len(learned) == 1:
+            return learned, 0
+        # Watch the literal with the highest remaining level second
+        best = max(range(1, len(learned)), key=lambda k: level[abs(learned[k])])
+        learned[1], learned[best] = learned[best], learned[1]
+        return learned, level[abs(learned[1])]
+
+    def implied(q, seen):
+        clause = reason[abs(q)]
+        if clause is None:
+            return False
+        return all(abs(r) in seen or level[abs(r)] == 0 for r in clause if r != -q)
+
+    def reduce_learnts():
+        # Keep the learned clauses with the lowest glue (distinct decision
+        # levels) plus any clause that is currently the reason of a literal
+        learnts.sort(key=lambda entry: entry[0])
+        keep = len(learnts) // 2
+        kept = learnts[:keep] + [entry for entry in learnts[keep:]
+                                 if entry[0] <= 2 or reason[abs(entry[1][0])] is entry[1]]
+        learnts[:] = kept
+        watches.clear()
+        for clause in problem:
+            watch(clause)
+        for _, clause in learnts:
+            watch(clause)
+
+    def backtrack(target):
+        nonlocal qhead
+        if len(trail_lim) <= target:
+            return
+        start = trail_lim[target]
+        for lit in trail[start:]:
+            var = abs(lit)
+            phase[var] = value[var]
+            value[var] = 0
+            reason[var] = None
+            heapq.heappush(heap, (-activity[var], var))
+        del trail[start:]
+        del trail_lim[target:]
+        qhead = start
+
+    restarts = 1
+    conflicts = 0
+    limit = restart_base * _luby(restarts)
+    max_learnts = max(len(problem) // 3, 1000)
+    while True:
+        conflict = propagate()
+        if conflict is not None:
+            if not trail_lim:
+                return None
+            conflicts += 1
+            learned, back_level = analyze(conflict)
+            backtrack(back_level)
+            if len(learned) == 1:
+                assign(learned[0], None)
+            else:
+                glue = len({level[abs(q)] for q in learned})
+                learnts.append((glue, learned))
+                watch(learned)
+                assign(learned[0], learned)
+            continue
+
+        if conflicts >= limit:
+            # Restart: keep learned clauses and activities, drop decisions
+            backtrack(0)
+            restarts += 1
+            conflicts = 0
+            limit = restart_base * _luby(restarts)
+            if len(learnts) > max_learnts:
+                reduce_learnts()
+                max_learnts = int(max_learnts * 1.1)
+
+        # Pick the unassigned variable with the highest activity
+        var = 0
+        while heap:
+            _, candidate = heapq.heappop(heap)
+            if value[candidate] == 0:
+                var = candidate
+                break
+        if var == 0:
+            return [0] + [v > 0 for v in value[1:]]
+        trail_lim.append(len(trail))
+        assign(var if phase[var] > 0 else -var, None)
+
+
+def solve_expression(postfix):
+    """
+    Find a satisfying assignment of a postfix expression with the SAT solver.
+    Output: dict from variable name to truth value, or None if unsatisfiable.
+    """
+    num_vars, clauses, variables = tseitin_cnf(postfix)
+    model = solve_cnf(num_vars, clauses)
+    if model is None:
+        return None
+    return {var: model[i + 1] for i, var in enumerate(variables)}
+
+
+def read_dimacs(file):
+    """Parse a DIMACS CNF file object into (num_vars, clauses)."""
+    num_vars = 0
+    clauses = []
+    current = []
+    for line in file:
+        line = line.strip()
+        if not line or line[0] in 'c%':
+            continue
+        if line[0] == 'p':
+            num_vars = int(line.split()[2])
+            continue
+        for lit in map(int, line.split()):
+            if lit == 0:
+                clauses.append(current)
+                current = []
+            else:
+                current.append(lit)
+                num_vars = max(num_vars, abs(lit))
+    if current:
+        clauses.append(current)
+    return num_vars, clauses
+
+
+def write_dimacs(file, num_vars, clauses, comments=()):
+    """Write a CNF formula in DIMACS format to a text file object."""
+    for comment in comments:
+        file.write(f"c {comment}\n")
+    file.write(f"p cnf {num_vars} {len(clauses)}\n")
+    for clause in clauses:
+        file.write(' '.join(map(str, clause)) + ' 0\n')
+
+
+def write_solution(file, model):
+    """Write a solver result in the SAT competition output format."""
+    if model is None:
+        file.write("s UNSATISFIABLE\n")
+        return
+    file.write("s SATISFIABLE\n")
+    literals = [str(v if model[v] else -v) for v in range(1, len(model))]
+    file.write("v " + ' '.join(literals + ['0']) + "\n")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="CDCL SAT solver for DIMACS files and infix expressions.")
+    parser.add_argument('cnf', nargs='?', help="DIMACS CNF file to solve (default: stdin)")
+    parser.add_argument('--expr', help="infix expression to convert with Tseitin and solve")
+    parser.add_argument('--dimacs-out', help="write the Tseitin CNF of --expr to this file")
+    args = parser.parse_args()
+
+    if args.expr is not None:
+        postfix = Infix2Postfix(args.expr)
+        num_vars, clauses, variables = tseitin_cnf(postfix)
+        if args.dimacs_out:
+            with open(args.dimacs_out, 'w') as out:
+                names = [f"{i + 1} = {var}" for i, var in enumerate(variables)]
+                write_dimacs(out, num_vars, clauses, [f"postfix {postfix}"] + names)
+        model = solve_cnf(num_vars, clauses)
+        if model is None:
+            print("UNSAT")
+        else:
+            print(' '.join(f"{var}={model[i + 1]}" for i, var in enumerate(variables)))
+    else:
+        if args.cnf:
+            with open(args.cnf) as file:
+                num_vars, clauses = read_dimacs(file)
+        else:
+            num_vars, clauses = read_dimacs(sys.stdin)
+        write_solution(sys.stdout, solve_cnf(num_vars, clauses))